@@ -1,3 +1,10 @@
-from .main import app
-
 __all__ = ["app"]
+
+
+def __getattr__(name: str):
+    # Resolved on first use so importing any submodule does not build the application.
+    if name == "app":
+        from .main import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,172 @@
+"""Hot/cold partitioning of finished jobs.
+
+``COMPLETED`` and ``CANCELLED`` jobs that reached their final state more than
+``ARCHIVE_AFTER_DAYS`` ago move, together with their invoices and credit notes,
+from ``jobs``/``invoices``/``credit_notes`` into the matching ``*_archive``
+tables. That keeps the hot tables and their indexes sized to live work.
+
+Each batch is copied and deleted in one transaction, so a batch is either
+fully moved or untouched and an interrupted run carries on when started again.
+The batch's jobs are locked while it moves (``FOR UPDATE`` on Postgres, the
+write lock on SQLite), so a job cannot be reopened or gain an invoice or credit
+note between the copy and the delete.
+Archiving is not a business delete: dashboard counters keep describing the full
+history (bulk statements bypass the counter listener, and
+:func:`app.rollups.compute_counters` counts the archive tables as well), while
+the full-text delete trigger drops archived jobs from search.
+
+History lookups opt in with ``include_archived``: :func:`history_source` swaps a
+model for an alias over its hot rows ``UNION ALL`` its archived rows.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, Select, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.visitors import replacement_traverse
+
+from .models import ArchivedCreditNote, ArchivedInvoice, ArchivedJob, CreditNote, Invoice, Job, JobStatus
+from .tasks import enqueue, task_handler
+
+ARCHIVES = {Job: ArchivedJob, Invoice: ArchivedInvoice, CreditNote: ArchivedCreditNote}
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.CANCELLED)
+ARCHIVE_JOBS_TASK = "jobs.archive"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveBatch:
+    jobs: int = 0
+    invoices: int = 0
+    credit_notes: int = 0
+    last_job_id: Optional[int] = None
+
+
+def archive_cutoff(days: int, now: Optional[datetime] = None) -> datetime:
+    return (now or datetime.utcnow()) - timedelta(days=days)
+
+
+def _finished_at():
+    # Cancelled jobs have no completed_at; their last update is the cancellation.
+    return func.coalesce(Job.completed_at, Job.updated_at, Job.scheduled_at)
+
+
+def _archivable(cutoff: datetime) -> list:
+    return [Job.status.in_(TERMINAL_STATUSES), _finished_at() < cutoff]
+
+
+def archivable_jobs(cutoff: datetime, after_id: int = 0) -> Select:
+    return select(Job.id).where(Job.id > after_id, *_archivable(cutoff))
+
+
+def _copy_rows(db: Session, model, criteria: list, archived_at: datetime) -> list[int]:
+    """Copy the matching rows of ``model`` to its archive table; returns the copied ids."""
+    archive = ARCHIVES[model]
+    columns = list(model.__table__.columns)
+    names = [column.name for column in columns] + ["archived_at"]
+    rows = select(*columns, literal(archived_at, DateTime)).where(*criteria)
+    return list(db.scalars(insert(archive).from_select(names, rows).returning(archive.id)))
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0) -> ArchiveBatch:
+    """Move the next ``batch_size`` archivable jobs after ``after_id``; the caller commits."""
+    # On Postgres the row locks keep these jobs from being reopened, and their
+    # invoices and credit notes from being added to, until the batch commits.
+    candidates = db.scalars(
+        archivable_jobs(cutoff, after_id).order_by(Job.id).limit(batch_size).with_for_update()
+    ).all()
+    if not candidates:
+        return ArchiveBatch()
+    archived_at = datetime.utcnow()
+    # SQLite ignores FOR UPDATE but takes its write lock with this first copy,
+    # so testing the jobs again here drops any that changed since the select.
+    job_ids = _copy_rows(db, Job, [Job.id.in_(candidates), *_archivable(cutoff)], archived_at)
+    batch = ArchiveBatch(last_job_id=candidates[-1])
+    if not job_ids:
+        return batch
+    for model in (Invoice, CreditNote):
+        # Lock the children too, so an edit cannot land between their copy and delete.
+        db.execute(select(model.id).where(model.job_id.in_(job_ids)).with_for_update())
+        _copy_rows(db, model, [model.job_id.in_(job_ids)], archived_at)
+    # Children first, so the foreign keys to jobs hold at every step.
+    batch.credit_notes = db.execute(delete(CreditNote).where(CreditNote.job_id.in_(job_ids))).rowcount
+    batch.invoices = db.execute(delete(Invoice).where(Invoice.job_id.in_(job_ids))).rowcount
+    batch.jobs = db.execute(delete(Job).where(Job.id.in_(job_ids))).rowcount
+    return batch
+
+
+def archive_jobs(
+    db: Session, cutoff: datetime, batch_size: int, max_batches: Optional[int] = None
+) -> tuple[ArchiveBatch, bool]:
+    """Archive in batches, committing each; returns the totals and whether archivable jobs remain."""
+    totals = ArchiveBatch()
+    batches = 0
+    after_id = 0
+    while max_batches is None or batches < max_batches:
+        batch = archive_batch(db, cutoff, batch_size, after_id)
+        db.commit()
+        if batch.last_job_id is None:
+            return totals, False
+        totals.jobs += batch.jobs
+        totals.invoices += batch.invoices
+        totals.credit_notes += batch.credit_notes
+        totals.last_job_id = after_id = batch.last_job_id
+        batches += 1
+    remaining = db.scalar(select(archivable_jobs(cutoff, after_id).limit(1).exists()))
+    return totals, bool(remaining)
+
+
+@task_handler(ARCHIVE_JOBS_TASK)
+def _archive_jobs_task(db: Session, cutoff: str, batch_size: int, max_batches: int) -> None:
+    # A bounded run keeps each task well inside its lease; the rest continues
+    # in a follow-up task that commits with this one's done marker.
+    totals, remaining = archive_jobs(db, datetime.fromisoformat(cutoff), batch_size, max_batches)
+    logger.info(
+        "Archived %d job(s), %d invoice(s) and %d credit note(s)",
+        totals.jobs,
+        totals.invoices,
+        totals.credit_notes,
+    )
+    if remaining:
+        enqueue(db, ARCHIVE_JOBS_TASK, cutoff=cutoff, batch_size=batch_size, max_batches=max_batches)
+
+
+def _retarget(criterion, source_table, target_table):
+    def replace(element):
+        if getattr(element, "table", None) is source_table and element.name in target_table.c:
+            return target_table.c[element.name]
+        return None
+
+    return replacement_traverse(criterion, {}, replace)
+
+
+def history_source(model, criteria: list, include_archived: bool):
+    """Return ``(source, criteria)`` to query ``model`` with or without its archived rows.
+
+    Without ``include_archived`` this is ``(model, criteria)``. Otherwise
+    ``source`` is an alias of ``model`` over hot and archived rows, both already
+    filtered by ``criteria``, and the returned criteria are empty. Either way
+    ``source`` stands in for ``model`` in the rest of the query.
+    """
+    if not include_archived:
+        return model, criteria
+    hot = model.__table__
+    cold = ARCHIVES[model].__table__
+    rows = union_all(
+        select(*hot.columns).where(*criteria),
+        select(*(cold.c[column.name] for column in hot.columns)).where(
+            *(_retarget(criterion, hot, cold) for criterion in criteria)
+        ),
+    ).subquery(f"{hot.name}_history")
+    return aliased(model, rows), []
+
+
+def get_with_archive(db: Session, model, row_id: int, include_archived: bool):
+    """``db.get`` that falls back to the archive table when ``include_archived``."""
+    row = db.get(model, row_id)
+    if row is None and include_archived:
+        row = db.get(ARCHIVES[model], row_id)
+    return row
@@ -0,0 +1,96 @@
+"""ETag / Last-Modified handling so unchanged polls are answered with 304."""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Query as OrmQuery
+
+from .pagination import PageParams, paginate
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+
+
+def check_conditional(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Set validators on ``response``; return a 304 response if the client copy is current."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = bool(
+            if_modified_since
+            and last_modified is not None
+            and _not_modified_since(if_modified_since, last_modified)
+        )
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers) if fresh else None
+
+
+def conditional_row(request: Request, response: Response, row) -> Optional[Response]:
+    updated_at = getattr(row, "updated_at", None)
+    etag = make_etag(row.__tablename__, row.id, updated_at)
+    return check_conditional(request, response, etag, updated_at)
+
+
+def collection_etag(request: Request, versions, next_cursor: Optional[str] = None) -> str:
+    rows = (f"{row_id}:{updated_at}" for row_id, updated_at in versions)
+    return make_etag(request.url.path, request.url.query, next_cursor, *rows)
+
+
+def _selects_columns(query: OrmQuery) -> bool:
+    return any(description["expr"] is not description["entity"] for description in query.column_descriptions)
+
+
+def paginate_conditional(
+    request: Request,
+    response: Response,
+    query: OrmQuery,
+    params: PageParams,
+    *,
+    sort: str,
+    column,
+    id_column,
+    version_column,
+):
+    """Like :func:`paginate`, but answers 304 when the page's rows are unchanged.
+
+    The page version is taken from the rows already fetched for the page, so
+    an unchanged poll costs the page query but is never serialized. Column
+    queries get the version column appended; serializers that zip the schema
+    fields with a row ignore it.
+    """
+    if _selects_columns(query):
+        query = query.add_columns(version_column)
+    page = paginate(query, params, sort=sort, column=column, id_column=id_column)
+    versions = [(getattr(row, id_column.key), getattr(row, version_column.key)) for row in page["items"]]
+    etag = collection_etag(request, versions, page["next_cursor"])
+    not_modified = check_conditional(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    return page
@@ -5,9 +5,48 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     APP_NAME: str = "Logistics Backend"
     DATABASE_URL: str = "sqlite:///./app.db"
+    ASYNC_DATABASE: bool = False
+    METRICS_ENABLED: bool = True
+    QUERY_BUDGET_WARNINGS: bool = False
+    FAST_LIST_SERIALIZATION: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: int = 2
+    PRECOMPILE_HOT_QUERIES: bool = True
+    DATABASE_READ_URLS: str = ""
+    DATABASE_READ_RETRY_SECONDS: float = 30.0
+    DATABASE_READ_PIN_SECONDS: float = 5.0
+    DATABASE_READ_PIN_CACHE_SIZE: int = 10000
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     SECRET_KEY: str = "super-secret-development-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    # The principal cache is per process: deactivating or deleting a driver
+    # clears it only in the process that handled the change, so the other
+    # workers keep accepting the driver's token for up to this many seconds.
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 5.0
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    DRIVER_EVENT_QUEUE_SIZE: int = 100
+    DRIVER_EVENT_HEARTBEAT_SECONDS: float = 15.0
+    TASK_WORKERS: int = 2
+    TASK_POLL_SECONDS: float = 1.0
+    TASK_LEASE_SECONDS: float = 300.0
+    TASK_MAX_ATTEMPTS: int = 5
+    TASK_RETRY_BASE_SECONDS: float = 2.0
+    TASK_RETENTION_DAYS: float = 7.0
+    TASK_CLEANUP_INTERVAL_SECONDS: float = 600.0
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_MAX_BATCHES_PER_TASK: int = 50
 
     class Config:
         env_file = ".env"
@@ -20,6 +59,24 @@ class Settings(BaseSettings):
 
         return self.DATABASE_URL
 
+    @property
+    def read_database_uris(self) -> list[str]:
+        """Comma-separated ``DATABASE_READ_URLS``, normalised like ``DATABASE_URL``."""
+        return [
+            url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url
+            for url in (item.strip() for item in self.DATABASE_READ_URLS.split(","))
+            if url
+        ]
+
+    @property
+    def async_database_uri(self) -> str:
+        url = self.sqlalchemy_database_uri
+        if url.startswith("sqlite:"):
+            return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+        if url.startswith("postgresql:"):
+            return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+        return url
+
 
 @lru_cache
 def get_settings() -> Settings:
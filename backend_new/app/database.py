@@ -1,27 +1,435 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+"""Engines and sessions, created from the configured ``Settings`` on first use.
 
-from .config import settings
+Nothing connects at import time: :data:`database` builds the primary engine,
+the optional async engine and the read replicas the first time they are
+needed, or up front in the application lifespan (see ``app.main.create_app``).
+``configure`` swaps in different settings, e.g. a test database, before use.
+``engine``, ``async_engine``, ``read_replicas`` and ``write_pins`` remain
+importable from this module and always refer to the current configuration.
+"""
+import itertools
+import threading
+import time
+from typing import Callable, Optional
 
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-def _get_engine_url() -> str:
-    return settings.sqlalchemy_database_uri
+from . import rollups  # noqa: F401  (registers the dashboard counter flush listener)
+from . import search  # noqa: F401  (registers the full-text index DDL on create_all)
+from .cache import TTLCache
+from .config import Settings, settings
 
 
-def _engine_kwargs() -> dict:
-    url = _get_engine_url()
-    if url.startswith("sqlite"):
+class PoolWaitStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "total_wait_seconds": round(self.total_wait, 6),
+                "avg_wait_seconds": round(self.total_wait / self.checkouts, 6) if self.checkouts else 0.0,
+                "max_wait_seconds": round(self.max_wait, 6),
+            }
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - started)
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def _pool_kwargs(config: Settings) -> dict:
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def _engine_kwargs(url: str, config: Settings) -> dict:
+    if _is_memory_sqlite(url):
+        # In-memory databases live on a single connection; SQLAlchemy picks
+        # the matching pool and sizing options do not apply.
         return {"connect_args": {"check_same_thread": False}}
-    return {}
+    kwargs = {"poolclass": TimedQueuePool, **_pool_kwargs(config)}
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    return kwargs
+
+
+def _sqlite_pragmas(config: Settings, read_only: bool = False) -> list[str]:
+    pragmas = [
+        f"PRAGMA cache_size={int(config.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}",
+    ]
+    if read_only:
+        return pragmas + ["PRAGMA query_only=ON"]
+    return [
+        f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}",
+    ] + pragmas
+
+
+def _listen_sqlite_pragmas(target: Engine, pragmas: list[str]) -> None:
+    def apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    event.listen(target, "connect", apply_pragmas)
+
+
+def _read_engine_url(url: str) -> str:
+    if _is_sqlite(url) and not _is_memory_sqlite(url):
+        # Read-only URI mode: a missing replica file fails to connect, and so
+        # falls back, instead of being created empty.
+        return f"sqlite:///file:{make_url(url).database}?mode=ro&uri=true"
+    return url
+
+
+def _create_read_engine(url: str, config: Settings) -> Engine:
+    kwargs = _engine_kwargs(url, config)
+    if "poolclass" in kwargs:
+        # pool_wait_stats describes the primary pool only.
+        kwargs["poolclass"] = QueuePool
+    read_engine = create_engine(_read_engine_url(url), **kwargs)
+    if _is_sqlite(url):
+        _listen_sqlite_pragmas(read_engine, _sqlite_pragmas(config, read_only=True))
+    return read_engine
+
+
+class ReadReplicas:
+    """Round-robin over the ``DATABASE_READ_URLS`` engines, skipping replicas that recently failed."""
+
+    def __init__(self, engines: list[Engine], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until = [0.0] * len(self.engines)
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> list[int]:
+        """Indexes of the healthy replicas, starting with the next one in turn."""
+        count = len(self.engines)
+        if not count:
+            return []
+        with self._lock:
+            start = next(self._turn) % count
+            now = time.monotonic()
+            order = ((start + step) % count for step in range(count))
+            return [index for index in order if self._down_until[index] <= now]
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": read_engine.url.render_as_string(hide_password=True),
+                "available": self._down_until[index] <= now,
+                "checked_out": (
+                    read_engine.pool.checkedout() if isinstance(read_engine.pool, QueuePool) else None
+                ),
+            }
+            for index, read_engine in enumerate(self.engines)
+        ]
+
+
+class _LazySessionmaker(sessionmaker):
+    """``sessionmaker`` that creates the primary engine when the first unbound session is made."""
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            database.engine
+        return super().__call__(**local_kw)
+
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            database.async_engine
+        return super().__call__(**local_kw)
+
+
+# The session factories are stable objects that can be imported anywhere; the
+# engine they bind to is attached when it is created.
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = _LazyAsyncSessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
 
+class Database:
+    """The engines for one ``Settings``, each created on first access."""
 
-engine = create_engine(_get_engine_url(), **_engine_kwargs())
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    def __init__(self, config: Settings):
+        self._lock = threading.RLock()
+        self._engine_hooks: list[Callable[[Engine], None]] = []
+        self._reset(config)
 
+    def _reset(self, config: Settings) -> None:
+        self.settings = config
+        self._engine: Optional[Engine] = None
+        self._async_engine = None
+        self._read_replicas: Optional[ReadReplicas] = None
+        # Callers that recently committed a write, keyed by their Authorization
+        # header, read from the primary until replication has had time to catch up.
+        self.write_pins = TTLCache(
+            maxsize=config.DATABASE_READ_PIN_CACHE_SIZE, ttl=config.DATABASE_READ_PIN_SECONDS
+        )
 
-def get_db():
+    def configure(self, config: Settings) -> None:
+        """Use ``config`` from now on; engines of the previous configuration are disposed."""
+        with self._lock:
+            self.dispose()
+            self._reset(config)
+
+    def add_engine_hook(self, hook: Callable[[Engine], None]) -> None:
+        """Call ``hook`` with every synchronous engine, already created or created later."""
+        with self._lock:
+            if hook in self._engine_hooks:
+                return
+            self._engine_hooks.append(hook)
+            for created in self._created_engines():
+                hook(created)
+
+    def _created(self, created: Engine) -> Engine:
+        for hook in self._engine_hooks:
+            hook(created)
+        return created
+
+    def _created_engines(self) -> list[Engine]:
+        engines = [self._engine] if self._engine is not None else []
+        if self._async_engine is not None:
+            engines.append(self._async_engine.sync_engine)
+        if self._read_replicas is not None:
+            engines.extend(self._read_replicas.engines)
+        return engines
+
+    @property
+    def url(self) -> str:
+        return self.settings.sqlalchemy_database_uri
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    created = create_engine(self.url, **_engine_kwargs(self.url, self.settings))
+                    if _is_sqlite(self.url):
+                        _listen_sqlite_pragmas(created, _sqlite_pragmas(self.settings))
+                    SessionLocal.configure(bind=created)
+                    self._engine = self._created(created)
+        return self._engine
+
+    @property
+    def async_engine(self):
+        """The async engine, or ``None`` when ``ASYNC_DATABASE`` is off."""
+        if self._async_engine is None and self.settings.ASYNC_DATABASE:
+            with self._lock:
+                if self._async_engine is None:
+                    kwargs = {} if _is_sqlite(self.url) else _pool_kwargs(self.settings)
+                    url = self.settings.async_database_uri
+                    try:
+                        created = create_async_engine(url, **kwargs)
+                    except ModuleNotFoundError as exc:
+                        raise RuntimeError(
+                            f"ASYNC_DATABASE needs the {exc.name!r} driver for {make_url(url).drivername}; "
+                            "install it or turn ASYNC_DATABASE off"
+                        ) from exc
+                    if _is_sqlite(self.url):
+                        _listen_sqlite_pragmas(created.sync_engine, _sqlite_pragmas(self.settings))
+                    AsyncSessionLocal.configure(bind=created)
+                    self._created(created.sync_engine)
+                    self._async_engine = created
+        return self._async_engine
+
+    @property
+    def read_replicas(self) -> ReadReplicas:
+        if self._read_replicas is None:
+            with self._lock:
+                if self._read_replicas is None:
+                    engines = [
+                        self._created(_create_read_engine(url, self.settings))
+                        for url in self.settings.read_database_uris
+                    ]
+                    self._read_replicas = ReadReplicas(engines, self.settings.DATABASE_READ_RETRY_SECONDS)
+        return self._read_replicas
+
+    def all_engines(self) -> list[Engine]:
+        """Every synchronous engine: the primary followed by the read replicas."""
+        return [self.engine, *self.read_replicas.engines]
+
+    def warm_up(self, connections: int) -> int:
+        """Open up to ``connections`` pooled connections per engine; returns how many were opened."""
+        opened = 0
+        for target in self.all_engines():
+            if not isinstance(target.pool, QueuePool):
+                continue
+            held = []
+            try:
+                for _ in range(min(connections, target.pool.size())):
+                    held.append(target.connect())
+            except DBAPIError:
+                # An unreachable replica is left to get_read_db's fallback.
+                pass
+            finally:
+                opened += len(held)
+                for connection in held:
+                    connection.close()
+        return opened
+
+    def dispose(self) -> None:
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+                SessionLocal.configure(bind=None)
+            if self._async_engine is not None:
+                # Outside an event loop only the pool reference can be dropped.
+                self._async_engine.sync_engine.dispose(close=False)
+                AsyncSessionLocal.configure(bind=None)
+            if self._read_replicas is not None:
+                for read_engine in self._read_replicas.engines:
+                    read_engine.dispose()
+            self._engine = self._async_engine = self._read_replicas = None
+
+
+database = Database(settings)
+
+
+def __getattr__(name: str):
+    # These follow the current configuration instead of being bound at import.
+    if name in ("engine", "async_engine", "read_replicas", "write_pins"):
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def configure(config: Settings) -> Database:
+    database.configure(config)
+    return database
+
+
+def all_engines() -> list[Engine]:
+    return database.all_engines()
+
+
+def pool_status() -> dict:
+    pool = database.engine.pool
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=database.settings.DB_MAX_OVERFLOW,
+            timeout_seconds=pool.timeout(),
+        )
+    status["wait"] = pool_wait_stats.snapshot()
+    if database.read_replicas.engines:
+        status["replicas"] = database.read_replicas.status()
+    return status
+
+
+def _pin_key(request: Request) -> Optional[str]:
+    if not database.read_replicas.engines:
+        return None
+    # Only authenticated callers are pinned: clients sharing an address (NAT,
+    # a proxy) must not pull each other onto the primary.
+    return request.headers.get("authorization")
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_to_primary(session: Session) -> None:
+    key = session.info.get("read_pin_key")
+    if key is not None:
+        database.write_pins.set(key, True)
+
+
+def get_db(request: Request):
     db = SessionLocal()
+    db.info["read_pin_key"] = _pin_key(request)
     try:
         yield db
     finally:
         db.close()
+
+
+def _open_replica_session() -> Optional[Session]:
+    replicas = database.read_replicas
+    for index in replicas.candidates():
+        db = ReadSessionLocal(bind=replicas.engines[index])
+        try:
+            db.connection()
+        except DBAPIError:
+            db.close()
+            replicas.mark_down(index)
+            continue
+        return db
+    return None
+
+
+def get_read_db(request: Request):
+    """Session for read-only routes: a healthy replica in turn, otherwise the primary.
+
+    An authenticated caller that committed a write within
+    ``DATABASE_READ_PIN_SECONDS`` stays on the primary so it always reads its
+    own writes.
+    """
+    key = _pin_key(request)
+    db = None if key is not None and database.write_pins.get(key) else _open_replica_session()
+    if db is None:
+        yield from get_db(request)
+        return
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db(request: Request):
+    if database.async_engine is None:
+        raise RuntimeError("ASYNC_DATABASE is disabled")
+    async with AsyncSessionLocal() as db:
+        db.info["read_pin_key"] = _pin_key(request)
+        yield db
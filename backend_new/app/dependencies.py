@@ -1,11 +1,19 @@
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .database import get_db
+from .cache import TTLCache
+from .config import Settings
+from .database import get_async_db, get_db
+from .events import EventHub
 from .models import Admin, Driver
-from .security import decode_token
-
+from .security import PasswordHasher, decode_token
+from .tasks import TaskWorkerPool
 
 oauth2_scheme_admin = OAuth2PasswordBearer(tokenUrl="token")
 oauth2_scheme_driver = OAuth2PasswordBearer(tokenUrl="drivers/login")
@@ -16,9 +24,55 @@ class Role(str):
     DRIVER = "driver"
 
 
-def _get_identity(token: str, expected_role: str, db: Session):
+@dataclass(frozen=True)
+class Principal:
+    """Session-independent snapshot of an authenticated admin or driver."""
+
+    id: int
+    email: str
+    full_name: str
+    phone: Optional[str] = None
+    is_active: bool = True
+
+
+# The settings passed to create_app and the services its lifespan built from them.
+def get_settings(request: Request) -> Settings:
+    return request.app.state.settings
+
+
+def get_principal_cache(request: Request) -> TTLCache:
+    return request.app.state.principal_cache
+
+
+def get_event_hub(request: Request) -> EventHub:
+    return request.app.state.event_hub
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.app.state.password_hasher
+
+
+def get_task_workers(request: Request) -> TaskWorkerPool:
+    return request.app.state.task_workers
+
+
+def invalidate_principal(cache: TTLCache, role: str, subject: str) -> None:
+    cache.invalidate((role, subject))
+
+
+def _principal_from(user) -> Principal:
+    return Principal(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        phone=getattr(user, "phone", None),
+        is_active=getattr(user, "is_active", True),
+    )
+
+
+def _token_subject(token: str, expected_role: str, config: Settings) -> str:
     try:
-        payload = decode_token(token)
+        payload = decode_token(token, config)
     except ValueError as exc:  # pragma: no cover - handled by FastAPI
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
 
@@ -28,24 +82,69 @@ def _get_identity(token: str, expected_role: str, db: Session):
     subject = payload.get("sub")
     if subject is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return subject
 
-    if expected_role == Role.ADMIN:
-        user = db.query(Admin).filter(Admin.email == subject).first()
-    else:
-        user = db.query(Driver).filter(Driver.email == subject).first()
 
+def _principal_model(role: str):
+    return Admin if role == Role.ADMIN else Driver
+
+
+def _cache_principal(cache: TTLCache, key: tuple, user) -> Principal:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    principal = _principal_from(user)
+    cache.set(key, principal)
+    return principal
+
+
+def _get_identity(token: str, expected_role: str, db: Session, request: Request) -> Principal:
+    subject = _token_subject(token, expected_role, get_settings(request))
+    key = (expected_role, subject)
+    cache = get_principal_cache(request)
+    principal = cache.get(key)
+    if principal is not None:
+        return principal
 
-    return user
+    model = _principal_model(expected_role)
+    return _cache_principal(cache, key, db.query(model).filter(model.email == subject).first())
 
 
-def get_current_admin(token: str = Depends(oauth2_scheme_admin), db: Session = Depends(get_db)):
-    return _get_identity(token, Role.ADMIN, db)
+async def _get_identity_async(
+    token: str, expected_role: str, db: AsyncSession, request: Request
+) -> Principal:
+    subject = _token_subject(token, expected_role, get_settings(request))
+    key = (expected_role, subject)
+    cache = get_principal_cache(request)
+    principal = cache.get(key)
+    if principal is not None:
+        return principal
 
+    model = _principal_model(expected_role)
+    result = await db.execute(select(model).where(model.email == subject))
+    return _cache_principal(cache, key, result.scalars().first())
 
-def get_current_driver(token: str = Depends(oauth2_scheme_driver), db: Session = Depends(get_db)):
-    driver = _get_identity(token, Role.DRIVER, db)
+
+def _require_active(driver: Principal) -> Principal:
     if not driver.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Driver inactive")
     return driver
+
+
+def get_current_admin(
+    request: Request, token: str = Depends(oauth2_scheme_admin), db: Session = Depends(get_db)
+):
+    return _get_identity(token, Role.ADMIN, db, request)
+
+
+def get_current_driver(
+    request: Request, token: str = Depends(oauth2_scheme_driver), db: Session = Depends(get_db)
+):
+    return _require_active(_get_identity(token, Role.DRIVER, db, request))
+
+
+async def get_current_driver_async(
+    request: Request,
+    token: str = Depends(oauth2_scheme_driver),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return _require_active(await _get_identity_async(token, Role.DRIVER, db, request))
@@ -0,0 +1,177 @@
+"""Load-balanced assignment of unassigned pending jobs to active drivers.
+
+Drivers sit in a min-heap keyed by their number of open jobs, so each job goes
+to the least-loaded driver whose schedule has no other job within the conflict
+window of its ``scheduled_at``. Schedules are kept as sorted lists, making the
+conflict check a bisect. Planning is pure Python over a handful of set-based
+reads; the resulting assignments are written in a few conditional batches.
+"""
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from .models import Driver, Job, JobStatus
+from .rollups import add_job, apply_deltas
+
+OPEN_STATUSES = (JobStatus.PENDING, JobStatus.ASSIGNED, JobStatus.IN_PROGRESS)
+
+NO_ACTIVE_DRIVERS = "No active drivers"
+DRIVERS_AT_CAPACITY = "All drivers at capacity"
+SCHEDULE_CONFLICT = "Every driver with capacity has a conflicting job"
+JOB_CHANGED = "Job was assigned or updated while dispatching"
+
+WRITE_BATCH_SIZE = 500
+
+
+@dataclass
+class Assignment:
+    job_id: int
+    driver_id: int
+    driver_load: int
+
+
+@dataclass
+class Unassigned:
+    job_id: int
+    reason: str
+
+
+def _conflicts(schedule: list, scheduled_at: Optional[datetime], window: timedelta) -> bool:
+    if scheduled_at is None or not schedule:
+        return False
+    index = bisect_left(schedule, scheduled_at - window)
+    return index < len(schedule) and schedule[index] < scheduled_at + window
+
+
+def plan_assignments(
+    jobs: list[tuple[int, Optional[datetime]]],
+    loads: dict[int, int],
+    schedules: dict[int, list],
+    conflict_window: timedelta,
+    max_jobs_per_driver: Optional[int] = None,
+) -> tuple[list[Assignment], list[Unassigned]]:
+    """Assign ``(job_id, scheduled_at)`` pairs to the drivers in ``loads`` (driver id -> open jobs).
+
+    ``schedules`` maps driver ids to the sorted ``scheduled_at`` values of their
+    open jobs and is updated in place as jobs are assigned.
+    """
+    heap = [(load, driver_id) for driver_id, load in loads.items()]
+    heapq.heapify(heap)
+    assigned: list[Assignment] = []
+    unassigned: list[Unassigned] = []
+
+    for job_id, scheduled_at in jobs:
+        skipped = []
+        choice = None
+        while heap:
+            load, driver_id = heapq.heappop(heap)
+            if max_jobs_per_driver is not None and load >= max_jobs_per_driver:
+                # The heap is ordered by load, so every remaining driver is full too.
+                skipped.append((load, driver_id))
+                break
+            if _conflicts(schedules[driver_id], scheduled_at, conflict_window):
+                skipped.append((load, driver_id))
+                continue
+            choice = (load, driver_id)
+            break
+
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        if choice is None:
+            if not loads:
+                reason = NO_ACTIVE_DRIVERS
+            elif skipped and max_jobs_per_driver is not None and skipped[-1][0] >= max_jobs_per_driver:
+                reason = DRIVERS_AT_CAPACITY
+            else:
+                reason = SCHEDULE_CONFLICT
+            unassigned.append(Unassigned(job_id=job_id, reason=reason))
+            continue
+
+        load, driver_id = choice
+        if scheduled_at is not None:
+            insort(schedules[driver_id], scheduled_at)
+        heapq.heappush(heap, (load + 1, driver_id))
+        assigned.append(Assignment(job_id=job_id, driver_id=driver_id, driver_load=load + 1))
+    return assigned, unassigned
+
+
+def _write_assignments(db: Session, assigned: list[Assignment]) -> set[int]:
+    """Set ``driver_id`` on jobs that are still pending and unassigned; returns the ids written.
+
+    The planning reads take no locks, so the state they saw is re-checked by
+    the UPDATE itself: a job another writer assigned or moved on in between
+    is left alone.
+    """
+    written: set[int] = set()
+    for start in range(0, len(assigned), WRITE_BATCH_SIZE):
+        batch = {item.job_id: item.driver_id for item in assigned[start : start + WRITE_BATCH_SIZE]}
+        statement = (
+            update(Job)
+            .where(Job.id.in_(batch), Job.status == JobStatus.PENDING, Job.driver_id.is_(None))
+            .values(driver_id=case(batch, value=Job.id))
+            .returning(Job.id)
+            .execution_options(synchronize_session=False)
+        )
+        written.update(db.scalars(statement))
+    return written
+
+
+def dispatch_pending_jobs(
+    db: Session,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    conflict_window: timedelta = timedelta(hours=1),
+    max_jobs_per_driver: Optional[int] = None,
+    dry_run: bool = False,
+) -> tuple[list[Assignment], list[Unassigned]]:
+    """Plan and, unless ``dry_run``, write assignments for unassigned pending jobs in the window.
+
+    Jobs keep their ``PENDING`` status, exactly as when an admin sets
+    ``driver_id`` by hand; the driver acknowledges them as usual. The caller
+    commits.
+    """
+    pending = select(Job.id, Job.scheduled_at).where(Job.status == JobStatus.PENDING, Job.driver_id.is_(None))
+    if window_start is not None:
+        pending = pending.where(Job.scheduled_at >= window_start)
+    if window_end is not None:
+        pending = pending.where(Job.scheduled_at < window_end)
+    jobs = db.execute(pending.order_by(Job.scheduled_at.is_(None), Job.scheduled_at, Job.id)).all()
+
+    active = select(Driver.id).where(Driver.is_active.is_(True))
+    loads = {driver_id: 0 for driver_id in db.scalars(active)}
+    open_jobs = (Job.status.in_(OPEN_STATUSES), Job.driver_id.in_(active))
+    counts = select(Job.driver_id, func.count()).where(*open_jobs).group_by(Job.driver_id)
+    for driver_id, count in db.execute(counts):
+        loads[driver_id] = count
+
+    schedules: dict[int, list] = defaultdict(list)
+    scheduled = select(Job.driver_id, Job.scheduled_at).where(*open_jobs, Job.scheduled_at.is_not(None))
+    if window_start is not None:
+        scheduled = scheduled.where(Job.scheduled_at >= window_start - conflict_window)
+    if window_end is not None:
+        scheduled = scheduled.where(Job.scheduled_at < window_end + conflict_window)
+    for driver_id, scheduled_at in db.execute(scheduled.order_by(Job.driver_id, Job.scheduled_at)):
+        schedules[driver_id].append(scheduled_at)
+
+    assigned, unassigned = plan_assignments(
+        [tuple(row) for row in jobs], loads, schedules, conflict_window, max_jobs_per_driver
+    )
+    if assigned and not dry_run:
+        written = _write_assignments(db, assigned)
+        changed = [item for item in assigned if item.job_id not in written]
+        unassigned += [Unassigned(item.job_id, JOB_CHANGED) for item in changed]
+        assigned = [item for item in assigned if item.job_id in written]
+        # Bulk UPDATE bypasses the unit of work, so the per-driver counters
+        # are moved from "unassigned" here, for the rows actually written.
+        deltas = defaultdict(float)
+        for item in assigned:
+            add_job(deltas, JobStatus.PENDING, None, -1)
+            add_job(deltas, JobStatus.PENDING, item.driver_id)
+        apply_deltas(db.connection(), deltas)
+    return assigned, unassigned
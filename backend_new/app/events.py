@@ -0,0 +1,152 @@
+"""In-process pub/sub for job events pushed to drivers over Server-Sent Events.
+
+Each open ``/drivers/me/events`` stream owns a bounded queue on the event loop
+that serves it. Handlers publish after their commit, from the threadpool or the
+loop itself; delivery is handed to the subscriber's loop so publishers never
+block on slow clients. When a queue fills up its pending events are dropped and
+replaced by a single ``resync`` event telling the app to refetch its jobs.
+
+Subscribers are local to the worker process that accepted the stream.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Optional
+
+from .config import Settings
+from .models import JobStatus
+from .schemas.job import JobRead
+
+JOB_ASSIGNED = "job.assigned"
+JOB_UPDATED = "job.updated"
+JOB_CANCELLED = "job.cancelled"
+RESYNC = "resync"
+
+
+def _format_event(event_id: int, event: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+class Subscription:
+    def __init__(self, hub: "EventHub", driver_id: int, maxsize: int):
+        self.hub = hub
+        self.driver_id = driver_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, message: str) -> None:
+        # Runs on the subscriber's loop, so the queue is never touched concurrently.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.hub.overflows += 1
+            message = _format_event(self.hub.next_id(), RESYNC, "{}")
+        self.queue.put_nowait(message)
+
+
+class EventHub:
+    def __init__(self, queue_size: int, heartbeat_seconds: float):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.overflows = 0
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "EventHub":
+        return cls(
+            queue_size=config.DRIVER_EVENT_QUEUE_SIZE, heartbeat_seconds=config.DRIVER_EVENT_HEARTBEAT_SECONDS
+        )
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def subscribe(self, driver_id: int) -> Subscription:
+        subscription = Subscription(self, driver_id, self.queue_size)
+        with self._lock:
+            self._subscribers[driver_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.driver_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.driver_id]
+
+    def is_subscribed(self, driver_id: int) -> bool:
+        with self._lock:
+            return driver_id in self._subscribers
+
+    def publish(self, driver_id: Optional[int], event: str, data: dict) -> int:
+        """Queue ``event`` for every stream of ``driver_id``; returns the number of streams reached."""
+        if driver_id is None:
+            return 0
+        with self._lock:
+            subscribers = list(self._subscribers.get(driver_id, ()))
+        if not subscribers:
+            return 0
+
+        message = _format_event(self.next_id(), event, json.dumps(data, separators=(",", ":")))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # The loop serving this stream has shut down.
+                self.unsubscribe(subscription)
+        self.published += 1
+        return len(subscribers)
+
+    async def stream(self, driver_id: int) -> AsyncIterator[str]:
+        subscription = self.subscribe(driver_id)
+        try:
+            yield f"retry: {int(self.heartbeat_seconds * 1000)}\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            streams = sum(len(subscribers) for subscribers in self._subscribers.values())
+            drivers = len(self._subscribers)
+        return {
+            "drivers": drivers,
+            "streams": streams,
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+
+def publish_job_change(
+    event_hub: EventHub, job, previous_driver_id: Optional[int] = None, deleted: bool = False
+) -> None:
+    """Notify the drivers affected by a committed create, update or delete.
+
+    ``job`` may be a loaded :class:`Job` or a :class:`JobRead` snapshot taken
+    before a delete, when the instance can no longer be read.
+    """
+    affected = {job.driver_id, previous_driver_id} - {None}
+    if not any(event_hub.is_subscribed(driver_id) for driver_id in affected):
+        return
+
+    payload = JobRead.model_validate(job).model_dump(mode="json")
+    if deleted or job.status == JobStatus.CANCELLED:
+        event_hub.publish(job.driver_id, JOB_CANCELLED, payload)
+    elif job.driver_id != previous_driver_id:
+        event_hub.publish(job.driver_id, JOB_ASSIGNED, payload)
+    else:
+        event_hub.publish(job.driver_id, JOB_UPDATED, payload)
+
+    if previous_driver_id is not None and previous_driver_id != job.driver_id:
+        event_hub.publish(previous_driver_id, JOB_CANCELLED, payload)
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterator
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+EXPORT_CHUNK_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_format(fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")) -> str:
+    return fmt
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _encode_ndjson(keys: list[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(keys, map(_plain, row))), separators=(",", ":")) + "\n" for row in rows
+    )
+
+
+def _encode_csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _iter_export(bind: Engine, statement: Select, fmt: str) -> Iterator[str]:
+    keys = list(statement.selected_columns.keys())
+    if fmt == "csv":
+        yield _encode_csv([keys])
+
+    # The generator owns its connection: request-scoped sessions are closed
+    # before a streaming body is consumed.
+    with bind.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE).execute(
+            statement
+        )
+        for partition in result.partitions():
+            yield _encode_csv(partition) if fmt == "csv" else _encode_ndjson(keys, partition)
+
+
+def export_response(bind: Engine, statement: Select, fmt: str, filename: str) -> StreamingResponse:
+    """Stream ``statement`` as NDJSON or CSV in chunks of ``EXPORT_CHUNK_SIZE`` rows."""
+    return StreamingResponse(
+        _iter_export(bind, statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,53 @@
+"""Opt-in list serialization that skips ORM hydration and response_model validation."""
+import json
+from datetime import date, datetime
+from enum import Enum
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Query as OrmQuery, Session
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode()
+
+
+def read_fields(schema: type[BaseModel]) -> list[str]:
+    return list(schema.model_fields)
+
+
+def list_query(db: Session, model, schema: type[BaseModel], fast: bool) -> OrmQuery:
+    """Query whole entities, or only the schema's columns as row tuples when ``fast``."""
+    if not fast:
+        return db.query(model)
+    return db.query(*(getattr(model, field) for field in read_fields(schema)))
+
+
+def fast_page_response(result, schema: type[BaseModel], response: Response):
+    """Render a page of column rows straight to JSON bytes.
+
+    304 responses from the conditional layer are passed through unchanged.
+    """
+    if isinstance(result, Response):
+        return result
+    fields = read_fields(schema)
+    payload = {
+        "items": [dict(zip(fields, row)) for row in result["items"]],
+        "next_cursor": result["next_cursor"],
+    }
+    return Response(dumps(payload), media_type="application/json", headers=dict(response.headers))
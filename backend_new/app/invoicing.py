@@ -0,0 +1,80 @@
+"""Set-based invoicing of completed jobs.
+
+A run issues a single ``INSERT ... SELECT`` that prices every completed job
+without an invoice. ``ON CONFLICT (job_id) DO NOTHING`` relies on the unique
+constraint on ``invoices.job_id``, so overlapping runs and retries never create
+duplicates.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import case, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from .models import Invoice, Job, JobStatus
+from .rollups import INVOICED_BY_DAY, apply_deltas
+
+Pricing = Callable[[], ColumnElement]
+
+
+def rate_table(default_rate: float, customer_rates: Optional[dict[int, float]] = None) -> Pricing:
+    """Price each job at its customer's rate, falling back to ``default_rate``."""
+
+    def amount() -> ColumnElement:
+        if not customer_rates:
+            return literal(default_rate)
+        return case(customer_rates, value=Job.customer_id, else_=default_rate)
+
+    return amount
+
+
+def _insert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def generate_invoices(
+    db: Session,
+    pricing: Pricing,
+    status: str = "draft",
+    completed_before: Optional[datetime] = None,
+) -> tuple[int, float]:
+    """Invoice completed, uninvoiced jobs in one statement; returns ``(created, total_amount)``.
+
+    ``pricing`` returns a SQL expression over ``Job`` columns, evaluated by the
+    database for every row. The caller commits.
+    """
+    issued_at = datetime.utcnow()
+    uninvoiced = ~select(Invoice.id).where(Invoice.job_id == Job.id).exists()
+    source = select(
+        Job.id,
+        Job.customer_id,
+        pricing(),
+        literal(status),
+        literal(issued_at),
+        literal(issued_at),
+    ).where(Job.status == JobStatus.COMPLETED, uninvoiced)
+    if completed_before is not None:
+        source = source.where(Job.completed_at < completed_before)
+
+    insert = _insert(db.get_bind().dialect.name)
+    statement = (
+        insert(Invoice)
+        .from_select(["job_id", "customer_id", "amount", "status", "issued_at", "updated_at"], source)
+        .on_conflict_do_nothing(index_elements=["job_id"])
+        .returning(Invoice.amount)
+    )
+    amounts = db.scalars(statement).all()
+
+    # INSERT ... SELECT bypasses the unit of work, so the dashboard counters
+    # are adjusted here.
+    total = float(sum(amounts))
+    deltas = defaultdict(float)
+    deltas[(INVOICED_BY_DAY, issued_at.date().isoformat())] += total
+    apply_deltas(db.connection(), deltas)
+    return len(amounts), total
@@ -1,34 +1,139 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+"""Application factory.
+
+``create_app(settings)`` builds an application for the given settings without
+touching the database; engines are created, the pool warmed and the hot
+queries compiled in the lifespan, before the first request is accepted. The
+lifespan also builds the principal cache, event hub, password hasher and task
+workers from those settings and keeps them on ``app.state``, where handlers
+reach them through the accessors in :mod:`app.dependencies`.
+``app`` is the application for the default settings, built on first access,
+for ``uvicorn app.main:app``; ``uvicorn --factory app.main:create_app`` works too.
+"""
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from .config import settings
-from .routers import auth, credit_notes, customers, drivers, health, invoices, jobs
+from fastapi import FastAPI, Request, status
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
-app = FastAPI(title=settings.APP_NAME)
+from .cache import TTLCache
+from .config import Settings
+from .database import SessionLocal, configure, database
+from .events import EventHub
+from .metrics import MetricsMiddleware, instrument_engine
+from .security import PasswordHasher, PasswordHasherBusy
+from .tasks import TaskWorkerPool
+from .warmup import warm_up
 
 allowed_origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
+def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
-app.include_router(health.router)
-app.include_router(auth.router)
-app.include_router(drivers.router)
-app.include_router(jobs.router)
-app.include_router(customers.router)
-app.include_router(invoices.router)
-app.include_router(credit_notes.router)
 
-
-@app.get("/")
 def read_root():
     return {"message": "Welcome to the Logistics Backend"}
+
+
+def _lifespan(config: Settings):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.warmup = await run_in_threadpool(warm_up, database, config)
+        app.state.principal_cache = TTLCache(
+            maxsize=config.PRINCIPAL_CACHE_SIZE, ttl=config.PRINCIPAL_CACHE_TTL_SECONDS
+        )
+        app.state.event_hub = EventHub.from_settings(config)
+        app.state.password_hasher = PasswordHasher(
+            workers=config.PASSWORD_HASH_WORKERS, max_pending=config.PASSWORD_HASH_MAX_PENDING
+        )
+        app.state.task_workers = TaskWorkerPool.from_settings(SessionLocal, config)
+        app.state.task_workers.start()
+        try:
+            yield
+        finally:
+            app.state.task_workers.stop()
+            app.state.password_hasher.shutdown()
+            if database.async_engine is not None:
+                await database.async_engine.dispose()
+            database.dispose()
+
+    return lifespan
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build the application; the process-wide database is configured from ``settings`` when given.
+
+    Without ``settings`` the database keeps its current configuration, so
+    importing this module never undoes an earlier ``app.database.configure``.
+    """
+    # Imported here so that importing this module does not load every router.
+    from .routers import (
+        admin,
+        auth,
+        credit_notes,
+        customers,
+        dashboard,
+        driver_async,
+        drivers,
+        health,
+        invoices,
+        jobs,
+        metrics,
+        search,
+    )
+
+    config = settings or database.settings
+    if database.settings is not config:
+        configure(config)
+
+    app = FastAPI(title=config.APP_NAME, lifespan=_lifespan(config))
+    app.state.settings = config
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    if config.METRICS_ENABLED or config.QUERY_BUDGET_WARNINGS:
+        app.add_middleware(MetricsMiddleware, budget_warnings=config.QUERY_BUDGET_WARNINGS)
+        database.add_engine_hook(instrument_engine)
+
+    app.add_exception_handler(PasswordHasherBusy, password_hasher_busy_handler)
+
+    if config.ASYNC_DATABASE:
+        app.include_router(driver_async.router)
+
+    app.include_router(health.router)
+    app.include_router(auth.router)
+    app.include_router(drivers.router)
+    app.include_router(jobs.router)
+    app.include_router(customers.router)
+    app.include_router(invoices.router)
+    app.include_router(credit_notes.router)
+    app.include_router(dashboard.router)
+    app.include_router(search.router)
+    app.include_router(admin.router)
+    if config.METRICS_ENABLED:
+        app.include_router(metrics.router)
+
+    app.add_api_route("/", read_root, methods=["GET"])
+    return app
+
+
+def __getattr__(name: str):
+    if name == "app":
+        application = globals()["app"] = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,221 @@
+"""In-process request and SQL metrics rendered in the Prometheus text format."""
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .query_budget import warn_if_over_budget
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STREAM_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 3600.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    le = _format_labels(self.label_names, labels, f'le="{_format_number(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {bucket_count}")
+                inf = _format_labels(self.label_names, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {count}")
+                label_text = _format_labels(self.label_names, labels)
+                lines.append(f"{self.name}_sum{label_text} {_format_number(total)}")
+                lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+REQUEST_LABELS = ("method", "route")
+
+request_latency = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", REQUEST_LABELS, LATENCY_BUCKETS
+)
+request_count = Counter(
+    "http_requests_total", "Requests by route and status code.", REQUEST_LABELS + ("status",)
+)
+# Event streams stay open for minutes; their durations would swamp the latency percentiles.
+stream_duration = Histogram(
+    "http_stream_duration_seconds", "Duration of streamed responses by route.", REQUEST_LABELS, STREAM_BUCKETS
+)
+request_statements = Histogram(
+    "http_request_db_statements", "SQL statements issued per request.", REQUEST_LABELS, STATEMENT_BUCKETS
+)
+request_db_time = Counter(
+    "http_request_db_seconds_total", "Time spent executing SQL per route.", REQUEST_LABELS
+)
+db_statements = Counter("db_statements_total", "SQL statements executed.")
+db_time = Counter("db_statement_seconds_total", "Time spent executing SQL statements.")
+db_errors = Counter("db_statement_errors_total", "SQL statements that raised an error.")
+
+REGISTRY = (
+    request_latency,
+    stream_duration,
+    request_count,
+    request_statements,
+    request_db_time,
+    db_statements,
+    db_time,
+    db_errors,
+)
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The start time lives on the execution context, so a statement that fails
+    # leaves nothing behind on the (long-lived) pooled connection.
+    if context is not None:
+        context.metrics_started_at = time.perf_counter()
+
+
+def _record_statement(context, failed: bool) -> None:
+    started = getattr(context, "metrics_started_at", None)
+    if started is None:
+        return
+    context.metrics_started_at = None
+    elapsed = time.perf_counter() - started
+    db_statements.inc()
+    db_time.inc(amount=elapsed)
+    if failed:
+        db_errors.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(context, failed=False)
+
+
+def _handle_error(exception_context) -> None:
+    if exception_context.execution_context is not None:
+        _record_statement(exception_context.execution_context, failed=True)
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL usage per route template."""
+
+    def __init__(self, app, budget_warnings: bool = False):
+        self.app = app
+        self.budget_warnings = budget_warnings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        streaming = False
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                streaming = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            (stream_duration if streaming else request_latency).observe(labels, elapsed)
+            request_count.inc(labels + (str(status_code),))
+            request_statements.observe(labels, stats.statements)
+            request_db_time.inc(labels, stats.db_seconds)
+            if self.budget_warnings:
+                warn_if_over_budget(*labels, stats.statements)
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,19 @@
-from .models import Base, Admin, Driver, Customer, Job, JobStatus, Invoice, CreditNote
+from .models import (
+    Base,
+    Admin,
+    Driver,
+    Customer,
+    Job,
+    JobStatus,
+    DRIVER_JOB_ORDER,
+    Invoice,
+    CreditNote,
+    ArchivedJob,
+    ArchivedInvoice,
+    ArchivedCreditNote,
+    DashboardCounter,
+    Task,
+)
 
 __all__ = [
     "Base",
@@ -7,6 +22,12 @@ __all__ = [
     "Customer",
     "Job",
     "JobStatus",
+    "DRIVER_JOB_ORDER",
     "Invoice",
     "CreditNote",
+    "ArchivedJob",
+    "ArchivedInvoice",
+    "ArchivedCreditNote",
+    "DashboardCounter",
+    "Task",
 ]
@@ -3,7 +3,19 @@ from __future__ import annotations
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, Column, DateTime, Enum as SqlEnum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum as SqlEnum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+)
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -28,6 +40,7 @@ class Admin(Base):
 
 class Driver(Base):
     __tablename__ = "drivers"
+    __table_args__ = (Index("ix_drivers_full_name_id", "full_name", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -35,18 +48,21 @@ class Driver(Base):
     phone = Column(String, nullable=True)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
 
     jobs = relationship("Job", back_populates="driver")
 
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (Index("ix_customers_name_id", "name", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False, index=True)
     address = Column(Text, nullable=True)
     phone = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
 
     jobs = relationship("Job", back_populates="customer")
     invoices = relationship("Invoice", back_populates="customer")
@@ -55,6 +71,17 @@ class Customer(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_driver_id_scheduled_at", "driver_id", "scheduled_at"),
+        Index("ix_jobs_status_scheduled_at", "status", "scheduled_at"),
+        Index("ix_jobs_customer_id", "customer_id"),
+        # List orderings: keyset pages read (sort column, id) ranges.
+        Index("ix_jobs_status_id", "status", "id"),
+        Index("ix_jobs_scheduled_at_id", "scheduled_at", "id"),
+        Index("ix_jobs_completed_at_id", "completed_at", "id"),
+        # Archived rows keep their ids; AUTOINCREMENT stops SQLite from handing them out again.
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -64,6 +91,7 @@ class Job(Base):
     completed_at = Column(DateTime, nullable=True)
     driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
 
     driver = relationship("Driver", back_populates="jobs")
     customer = relationship("Customer", back_populates="jobs")
@@ -71,8 +99,20 @@ class Job(Base):
     credit_notes = relationship("CreditNote", back_populates="job")
 
 
+# A driver's job list: scheduled jobs first, by time. The index matches the
+# whole ordering, NULL test included, so the list is read without a sort.
+DRIVER_JOB_ORDER = (Job.scheduled_at.is_(None), Job.scheduled_at, Job.id)
+Index("ix_jobs_driver_id_schedule_order", Job.driver_id, *DRIVER_JOB_ORDER)
+
+
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        Index("ix_invoices_customer_id_issued_at", "customer_id", "issued_at"),
+        Index("ix_invoices_issued_at_id", "issued_at", "id"),
+        Index("ix_invoices_amount_id", "amount", "id"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(Integer, ForeignKey("jobs.id"), unique=True, nullable=False)
@@ -80,6 +120,7 @@ class Invoice(Base):
     amount = Column(Float, nullable=False)
     status = Column(String, default="draft", nullable=False)
     issued_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
 
     job = relationship("Job", back_populates="invoice")
     customer = relationship("Customer", back_populates="invoices")
@@ -87,6 +128,13 @@ class Invoice(Base):
 
 class CreditNote(Base):
     __tablename__ = "credit_notes"
+    __table_args__ = (
+        Index("ix_credit_notes_customer_id_created_at", "customer_id", "created_at"),
+        Index("ix_credit_notes_job_id", "job_id"),
+        Index("ix_credit_notes_created_at_id", "created_at", "id"),
+        Index("ix_credit_notes_amount_id", "amount", "id"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
@@ -94,6 +142,87 @@ class CreditNote(Base):
     amount = Column(Float, nullable=False)
     reason = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
 
     job = relationship("Job", back_populates="credit_notes")
     customer = relationship("Customer", back_populates="credit_notes")
+
+
+class ArchivedJob(Base):
+    """A terminal job moved out of ``jobs``; columns mirror :class:`Job`, without foreign keys."""
+
+    __tablename__ = "jobs_archive"
+    __table_args__ = (
+        Index("ix_jobs_archive_customer_id", "customer_id"),
+        Index("ix_jobs_archive_driver_id_scheduled_at", "driver_id", "scheduled_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(SqlEnum(JobStatus), nullable=False)
+    scheduled_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    driver_id = Column(Integer, nullable=True)
+    customer_id = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ArchivedInvoice(Base):
+    __tablename__ = "invoices_archive"
+    __table_args__ = (
+        Index("ix_invoices_archive_customer_id_issued_at", "customer_id", "issued_at"),
+        Index("ix_invoices_archive_job_id", "job_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    customer_id = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    status = Column(String, nullable=False)
+    issued_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ArchivedCreditNote(Base):
+    __tablename__ = "credit_notes_archive"
+    __table_args__ = (
+        Index("ix_credit_notes_archive_customer_id_created_at", "customer_id", "created_at"),
+        Index("ix_credit_notes_archive_job_id", "job_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    customer_id = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    reason = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DashboardCounter(Base):
+    __tablename__ = "dashboard_counters"
+
+    metric = Column(String, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0)
+
+
+class Task(Base):
+    __tablename__ = "tasks"
+    __table_args__ = (Index("ix_tasks_status_run_after", "status", "run_after"),)
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, default="pending", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
@@ -0,0 +1,112 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query as OrmQuery
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor"),
+        order: str = Query("asc", pattern="^(asc|desc)$"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.descending = order == "desc"
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_cursor(sort: str, value, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif hasattr(value, "value"):
+        value = value.value
+    raw = json.dumps({"s": sort, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, column) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort or not isinstance(data["id"], int):
+            raise ValueError("cursor does not match sort")
+        value = data["v"]
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+    except (ValueError, KeyError, TypeError) as exc:
+        raise _invalid_cursor() from exc
+    return value, data["id"]
+
+
+def _nullable(column) -> bool:
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def page_rows(query: OrmQuery, params: PageParams, *, sort: str, column, id_column) -> list:
+    """Rows of the requested page plus one look-ahead row, read from an index range.
+
+    The window is ordered by ``(column, id_column)`` so an index ending in the
+    id serves it; no ``IS NULL`` sort key is needed. NULL sort values come last
+    in both directions: they are read by a second query, ordered by id, only
+    once the non-NULL rows run out.
+    """
+    limit = params.limit + 1
+    direction = (lambda c: c.desc()) if params.descending else (lambda c: c.asc())
+    beyond = (lambda a, b: a < b) if params.descending else (lambda a, b: a > b)
+    cursor = decode_cursor(params.cursor, sort, column) if params.cursor else None
+
+    if column is id_column:
+        if cursor is not None:
+            query = query.filter(beyond(id_column, cursor[1]))
+        return query.order_by(direction(id_column)).limit(limit).all()
+
+    nullable = _nullable(column)
+    rows = []
+    if cursor is None or cursor[0] is not None:
+        values = query.filter(column.is_not(None)) if nullable else query
+        if cursor is not None:
+            values = values.filter(beyond(tuple_(column, id_column), tuple_(*cursor)))
+        rows = values.order_by(direction(column), direction(id_column)).limit(limit).all()
+        if not nullable or len(rows) == limit:
+            return rows
+    nulls = query.filter(column.is_(None))
+    if cursor is not None and cursor[0] is None:
+        nulls = nulls.filter(beyond(id_column, cursor[1]))
+    return rows + nulls.order_by(direction(id_column)).limit(limit - len(rows)).all()
+
+
+def paginate(query: OrmQuery, params: PageParams, *, sort: str, column, id_column) -> dict:
+    """Apply keyset pagination ordered by ``column`` with ``id_column`` as tie-breaker.
+
+    Only rows after the cursor are read, so the cost of a page does not grow
+    with the number of rows that precede it.
+    """
+    rows = page_rows(query, params, sort=sort, column=column, id_column=id_column)
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), getattr(last, id_column.key))
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def sort_column(model, sort: str, allowed: tuple[str, ...]):
+    if sort not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort field; expected one of: {', '.join(allowed)}",
+        )
+    return getattr(model, sort)
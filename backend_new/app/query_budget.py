@@ -0,0 +1,85 @@
+"""Query counting and per-endpoint statement budgets for catching N+1 regressions."""
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Statements a request may issue, including the principal lookup on a cold
+# auth cache. List endpoints must not grow with the number of rows returned.
+ENDPOINT_BUDGETS: dict[tuple[str, str], int] = {
+    ("GET", "/jobs"): 3,
+    ("GET", "/jobs/{job_id}"): 2,
+    ("GET", "/invoices"): 3,
+    ("GET", "/customers"): 3,
+    ("GET", "/credit-notes"): 3,
+    ("GET", "/drivers"): 3,
+    ("GET", "/drivers/me"): 1,
+    ("GET", "/drivers/me/jobs"): 3,
+    ("POST", "/jobs/{job_id}/{action}"): 5,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryCounter:
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+def endpoint_budget(method: str, route: str) -> Optional[int]:
+    return ENDPOINT_BUDGETS.get((method.upper(), route))
+
+
+@contextmanager
+def count_queries(bind: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """Count every statement executed on ``bind`` (any thread) while the block runs.
+
+    Without ``bind`` the primary and every read replica are counted.
+    """
+    if bind is None:
+        from .database import all_engines
+
+        binds = all_engines()
+    else:
+        binds = [bind]
+
+    counter = QueryCounter()
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    for target in binds:
+        event.listen(target, "after_cursor_execute", _record)
+    try:
+        yield counter
+    finally:
+        for target in binds:
+            event.remove(target, "after_cursor_execute", _record)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, bind: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    with count_queries(bind) as counter:
+        yield counter
+    if counter.count > max_queries:
+        listing = "\n".join(f"  {index}. {sql}" for index, sql in enumerate(counter.statements, 1))
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} queries, {counter.count} were executed:\n{listing}"
+        )
+
+
+def warn_if_over_budget(method: str, route: str, statements: int) -> None:
+    budget = endpoint_budget(method, route)
+    if budget is not None and statements > budget:
+        logger.warning("%s %s issued %d SQL statements (budget %d)", method, route, statements, budget)
@@ -0,0 +1,192 @@
+"""Dashboard counters maintained incrementally in ``dashboard_counters``.
+
+Counters are adjusted in the same transaction as the write that changes them:
+ORM flushes are handled by a session listener, while bulk statements that
+bypass the unit of work call :func:`apply_deltas` themselves. Archiving moves
+rows with bulk statements and leaves counters alone on purpose.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    ArchivedCreditNote,
+    ArchivedInvoice,
+    ArchivedJob,
+    CreditNote,
+    DashboardCounter,
+    Invoice,
+    Job,
+    JobStatus,
+)
+
+JOBS_BY_STATUS = "jobs_by_status"
+JOBS_BY_DRIVER = "jobs_by_driver"
+INVOICED_BY_DAY = "invoiced_by_day"
+CREDITED_BY_DAY = "credited_by_day"
+UNASSIGNED = "unassigned"
+
+Deltas = dict[tuple[str, str], float]
+
+_TRACKED = {
+    Job: ("status", "driver_id"),
+    Invoice: ("amount", "issued_at"),
+    CreditNote: ("amount", "created_at"),
+}
+
+
+def _status_key(value) -> str:
+    return JobStatus(value).value
+
+
+def _driver_key(driver_id: Optional[int]) -> str:
+    return UNASSIGNED if driver_id is None else str(driver_id)
+
+
+def _day_key(moment) -> str:
+    return str(moment)[:10] if moment is not None else datetime.utcnow().date().isoformat()
+
+
+def add_job(deltas: Deltas, status, driver_id: Optional[int], sign: int = 1) -> None:
+    deltas[(JOBS_BY_STATUS, _status_key(status))] += sign
+    deltas[(JOBS_BY_DRIVER, _driver_key(driver_id))] += sign
+
+
+def _add_entry(deltas: Deltas, obj, values: dict, sign: int) -> None:
+    if isinstance(obj, Job):
+        add_job(deltas, values["status"], values["driver_id"], sign)
+    elif isinstance(obj, Invoice):
+        deltas[(INVOICED_BY_DAY, _day_key(values["issued_at"]))] += sign * values["amount"]
+    else:
+        deltas[(CREDITED_BY_DAY, _day_key(values["created_at"]))] += sign * values["amount"]
+
+
+def _current_values(obj) -> dict:
+    return {attr: getattr(obj, attr) for attr in _TRACKED[type(obj)]}
+
+
+def _committed_values(obj) -> dict:
+    values = {}
+    for attr in _TRACKED[type(obj)]:
+        history = inspect(obj).attrs[attr].history
+        committed = history.deleted or history.unchanged
+        values[attr] = committed[0] if committed else getattr(obj, attr)
+    return values
+
+
+def apply_deltas(connection, deltas: Deltas) -> None:
+    rows = [
+        {"metric": metric, "dimension": dimension, "value": value}
+        for (metric, dimension), value in deltas.items()
+        if value
+    ]
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    statement = insert(DashboardCounter.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["metric", "dimension"],
+        set_={"value": DashboardCounter.__table__.c.value + statement.excluded.value},
+    )
+    connection.execute(statement, rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_counters(session: Session, flush_context) -> None:
+    deltas: Deltas = defaultdict(float)
+    for obj in session.new:
+        if type(obj) in _TRACKED:
+            _add_entry(deltas, obj, _current_values(obj), 1)
+    for obj in session.dirty:
+        if type(obj) in _TRACKED and session.is_modified(obj, include_collections=False):
+            _add_entry(deltas, obj, _committed_values(obj), -1)
+            _add_entry(deltas, obj, _current_values(obj), 1)
+    for obj in session.deleted:
+        if type(obj) in _TRACKED:
+            _add_entry(deltas, obj, _committed_values(obj), -1)
+    apply_deltas(session.connection(), deltas)
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Registering with active_history makes SQLAlchemy load the previous value
+# before an assignment, so dirty rows always report what they are replacing.
+for _model, _attrs in _TRACKED.items():
+    for _attr in _attrs:
+        event.listen(
+            getattr(_model, _attr), "set", _load_previous_value, active_history=True, retval=True
+        )
+
+
+def compute_counters(session: Session) -> Deltas:
+    # Archived rows still count: archiving moves history out of the hot tables,
+    # it does not remove it from the dashboard.
+    counters: Deltas = defaultdict(float)
+    for job in (Job, ArchivedJob):
+        for status, count in session.execute(select(job.status, func.count()).group_by(job.status)):
+            counters[(JOBS_BY_STATUS, _status_key(status))] += count
+        by_driver = select(job.driver_id, func.count()).group_by(job.driver_id)
+        for driver_id, count in session.execute(by_driver):
+            counters[(JOBS_BY_DRIVER, _driver_key(driver_id))] += count
+    for metric, column, amount in (
+        (INVOICED_BY_DAY, Invoice.issued_at, Invoice.amount),
+        (INVOICED_BY_DAY, ArchivedInvoice.issued_at, ArchivedInvoice.amount),
+        (CREDITED_BY_DAY, CreditNote.created_at, CreditNote.amount),
+        (CREDITED_BY_DAY, ArchivedCreditNote.created_at, ArchivedCreditNote.amount),
+    ):
+        day = func.date(column)
+        for value, total in session.execute(select(day, func.sum(amount)).group_by(day)):
+            counters[(metric, _day_key(value))] += total or 0.0
+    return counters
+
+
+def rebuild_counters(session: Session) -> dict[tuple[str, str], tuple[float, float]]:
+    """Recompute every counter from the source tables; returns ``{key: (stored, actual)}`` drift."""
+    expected = compute_counters(session)
+    stored = {
+        (row.metric, row.dimension): row.value for row in session.scalars(select(DashboardCounter))
+    }
+    drift = {
+        key: (stored.get(key, 0.0), expected.get(key, 0.0))
+        for key in stored.keys() | expected.keys()
+        if not math.isclose(stored.get(key, 0.0), expected.get(key, 0.0), abs_tol=1e-6)
+    }
+    session.execute(delete(DashboardCounter))
+    apply_deltas(session.connection(), expected)
+    return drift
+
+
+def read_summary(session: Session, days: int) -> dict:
+    cutoff = (datetime.utcnow() - timedelta(days=days - 1)).date().isoformat()
+    summary: dict[str, dict] = {
+        JOBS_BY_STATUS: {status.value: 0 for status in JobStatus},
+        JOBS_BY_DRIVER: {},
+        INVOICED_BY_DAY: {},
+        CREDITED_BY_DAY: {},
+    }
+    rows = session.scalars(
+        select(DashboardCounter).where(
+            DashboardCounter.metric.in_((JOBS_BY_STATUS, JOBS_BY_DRIVER))
+            | (
+                DashboardCounter.metric.in_((INVOICED_BY_DAY, CREDITED_BY_DAY))
+                & (DashboardCounter.dimension >= cutoff)
+            )
+        )
+    )
+    for row in rows:
+        if row.metric in (JOBS_BY_STATUS, JOBS_BY_DRIVER):
+            summary[row.metric][row.dimension] = int(row.value)
+        else:
+            summary[row.metric][row.dimension] = round(row.value, 2)
+    summary[JOBS_BY_DRIVER] = {key: value for key, value in summary[JOBS_BY_DRIVER].items() if value}
+    return summary
@@ -1,11 +1,29 @@
-from . import auth, customers, drivers, health, invoices, credit_notes, jobs
+from . import (
+    admin,
+    auth,
+    credit_notes,
+    customers,
+    dashboard,
+    driver_async,
+    drivers,
+    health,
+    invoices,
+    jobs,
+    metrics,
+    search,
+)
 
 __all__ = [
+    "admin",
     "auth",
     "customers",
+    "dashboard",
+    "driver_async",
     "drivers",
     "health",
     "invoices",
     "credit_notes",
     "jobs",
+    "metrics",
+    "search",
 ]
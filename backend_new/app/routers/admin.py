@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from ..cache import TTLCache
+from ..database import get_db, pool_status
+from ..dependencies import get_current_admin, get_event_hub, get_principal_cache, get_task_workers
+from ..events import EventHub
+from ..tasks import TaskWorkerPool
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/cache", summary="Principal cache statistics")
+def read_cache_stats(
+    cache: TTLCache = Depends(get_principal_cache), admin=Depends(get_current_admin)
+):
+    return {"principals": cache.stats()}
+
+
+@router.get("/pool", summary="Database connection pool state")
+def read_pool_status(admin=Depends(get_current_admin)):
+    return pool_status()
+
+
+@router.get("/events", summary="Driver event stream statistics")
+def read_event_stats(event_hub: EventHub = Depends(get_event_hub), admin=Depends(get_current_admin)):
+    return event_hub.stats()
+
+
+@router.get("/tasks", summary="Background task queue depth and lag")
+def read_task_stats(
+    db: Session = Depends(get_db),
+    task_workers: TaskWorkerPool = Depends(get_task_workers),
+    admin=Depends(get_current_admin),
+):
+    return task_workers.stats(db)
@@ -1,55 +1,72 @@
 from datetime import datetime, timedelta
 
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ..config import settings
+from ..config import Settings
 from ..database import get_db
-from ..dependencies import Role
+from ..dependencies import Role, get_password_hasher, get_settings
 from ..models import Admin, Driver
 from ..schemas.auth import AdminToken, DriverToken
-from ..security import create_access_token, verify_password
+from ..security import PasswordHasher, create_access_token
 
 router = APIRouter(tags=["auth"])
 
 
+# Login handlers are async so a queued password check is awaited rather than
+# holding a threadpool worker; only the short lookup runs in the threadpool.
+def _find_by_email(db: Session, model, email: str):
+    principal = db.query(model).filter(model.email == email).first()
+    # Hand the connection back to the pool before the password check; the
+    # detached row keeps its loaded columns.
+    db.close()
+    return principal
+
+
 @router.post("/token", response_model=AdminToken, summary="Admin login")
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+    config: Settings = Depends(get_settings),
 ):
-    admin = db.query(Admin).filter(Admin.email == form_data.username).first()
-    if not admin or not verify_password(form_data.password, admin.hashed_password):
+    admin = await run_in_threadpool(_find_by_email, db, Admin, form_data.username)
+    if not admin or not await hasher.verify(form_data.password, admin.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     expires_at = datetime.utcnow() + access_token_expires
     access_token = create_access_token(
         admin.email,
         Role.ADMIN,
+        config=config,
         subject_id=admin.id,
         expires_delta=access_token_expires,
     )
     return AdminToken(access_token=access_token, expires_at=expires_at)
 
 
-
 @router.post("/drivers/login", response_model=DriverToken, summary="Driver login")
-def driver_login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+async def driver_login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+    config: Settings = Depends(get_settings),
 ):
-    driver = db.query(Driver).filter(Driver.email == form_data.username).first()
-    if not driver or not verify_password(form_data.password, driver.hashed_password):
+    driver = await run_in_threadpool(_find_by_email, db, Driver, form_data.username)
+    if not driver or not await hasher.verify(form_data.password, driver.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
     if not driver.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Driver inactive")
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     expires_at = datetime.utcnow() + access_token_expires
     access_token = create_access_token(
         driver.email,
         Role.DRIVER,
+        config=config,
         subject_id=driver.id,
         expires_delta=access_token_expires,
     )
@@ -1,17 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..archiving import get_with_archive, history_source
+from ..conditional import conditional_row, paginate_conditional
+from ..database import get_db, get_read_db
 from ..dependencies import get_current_admin
+from ..exporting import export_format, export_response
 from ..models import CreditNote
+from ..pagination import PageParams, sort_column
 from ..schemas.credit_note import CreditNoteCreate, CreditNoteRead, CreditNoteUpdate
+from ..schemas.pagination import Page
 
 router = APIRouter(prefix="/credit-notes", tags=["credit-notes"])
 
 
-@router.get("", response_model=list[CreditNoteRead])
-def list_credit_notes(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return db.query(CreditNote).all()
+CREDIT_NOTE_SORT_FIELDS = ("id", "created_at", "amount")
+
+
+def credit_note_filters(
+    customer_id: Optional[int] = None,
+    job_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> list:
+    criteria = []
+    if customer_id is not None:
+        criteria.append(CreditNote.customer_id == customer_id)
+    if job_id is not None:
+        criteria.append(CreditNote.job_id == job_id)
+    if created_from is not None:
+        criteria.append(CreditNote.created_at >= created_from)
+    if created_to is not None:
+        criteria.append(CreditNote.created_at < created_to)
+    return criteria
+
+
+@router.get("", response_model=Page[CreditNoteRead])
+def list_credit_notes(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    sort: str = Query("id"),
+    criteria: list = Depends(credit_note_filters),
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    source, criteria = history_source(CreditNote, criteria, include_archived)
+    column = sort_column(source, sort, CREDIT_NOTE_SORT_FIELDS)
+    query = db.query(source).filter(*criteria)
+    return paginate_conditional(
+        request,
+        response,
+        query,
+        page,
+        sort=sort,
+        column=column,
+        id_column=source.id,
+        version_column=source.updated_at,
+    )
+
+
+@router.get("/export", summary="Stream credit notes as NDJSON or CSV")
+def export_credit_notes(
+    fmt: str = Depends(export_format),
+    criteria: list = Depends(credit_note_filters),
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    source, criteria = history_source(CreditNote, criteria, include_archived)
+    columns = [getattr(source, field) for field in CreditNoteRead.model_fields]
+    statement = select(*columns).where(*criteria).order_by(source.id)
+    return export_response(db.get_bind(), statement, fmt, "credit-notes")
 
 
 @router.post("", response_model=CreditNoteRead, status_code=status.HTTP_201_CREATED)
@@ -30,13 +95,16 @@ def create_credit_note(
 @router.get("/{credit_note_id}", response_model=CreditNoteRead)
 def read_credit_note(
     credit_note_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
     admin=Depends(get_current_admin),
 ):
-    credit_note = db.get(CreditNote, credit_note_id)
+    credit_note = get_with_archive(db, CreditNote, credit_note_id, include_archived)
     if not credit_note:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Credit note not found")
-    return credit_note
+    return conditional_row(request, response, credit_note) or credit_note
 
 
 @router.put("/{credit_note_id}", response_model=CreditNoteRead)
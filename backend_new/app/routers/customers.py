@@ -1,17 +1,176 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, literal, select, union_all
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..archiving import history_source
+from ..conditional import conditional_row, paginate_conditional
+from ..database import get_db, get_read_db
 from ..dependencies import get_current_admin
-from ..models import Customer
-from ..schemas.customer import CustomerCreate, CustomerRead, CustomerUpdate
+from ..models import CreditNote, Customer, Invoice
+from ..pagination import PageParams, paginate, sort_column
+from ..schemas.customer import (
+    CustomerBalance,
+    CustomerCreate,
+    CustomerLedger,
+    CustomerRead,
+    CustomerUpdate,
+)
+from ..schemas.pagination import Page
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
 
-@router.get("", response_model=list[CustomerRead])
-def list_customers(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return db.query(Customer).all()
+CUSTOMER_SORT_FIELDS = ("id", "name", "email")
+
+
+@router.get("", response_model=Page[CustomerRead])
+def list_customers(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    sort: str = Query("id"),
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    column = sort_column(Customer, sort, CUSTOMER_SORT_FIELDS)
+    return paginate_conditional(
+        request,
+        response,
+        db.query(Customer),
+        page,
+        sort=sort,
+        column=column,
+        id_column=Customer.id,
+        version_column=Customer.updated_at,
+    )
+
+
+def _date_range(column, date_from: Optional[datetime], date_to: Optional[datetime]) -> list:
+    criteria = []
+    if date_from is not None:
+        criteria.append(column >= date_from)
+    if date_to is not None:
+        criteria.append(column < date_to)
+    return criteria
+
+
+def _totals_by_customer(
+    db: Session, customer_ids: list[int], date_from: Optional[datetime], date_to: Optional[datetime]
+) -> tuple[dict[int, float], dict[int, float]]:
+    # Archiving moves old documents out of the hot tables; totals still cover them.
+    invoices, invoice_criteria = history_source(
+        Invoice,
+        [Invoice.customer_id.in_(customer_ids), *_date_range(Invoice.issued_at, date_from, date_to)],
+        include_archived=True,
+    )
+    credit_notes, credit_note_criteria = history_source(
+        CreditNote,
+        [CreditNote.customer_id.in_(customer_ids), *_date_range(CreditNote.created_at, date_from, date_to)],
+        include_archived=True,
+    )
+    invoiced = db.execute(
+        select(invoices.customer_id, func.sum(invoices.amount))
+        .where(*invoice_criteria)
+        .group_by(invoices.customer_id)
+    ).all()
+    credited = db.execute(
+        select(credit_notes.customer_id, func.sum(credit_notes.amount))
+        .where(*credit_note_criteria)
+        .group_by(credit_notes.customer_id)
+    ).all()
+    return dict(invoiced), dict(credited)
+
+
+@router.get("/balances", response_model=Page[CustomerBalance], summary="Invoiced, credited and net totals")
+def list_customer_balances(
+    page: PageParams = Depends(),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    result = paginate(db.query(Customer), page, sort="id", column=Customer.id, id_column=Customer.id)
+    customers = result["items"]
+    invoiced, credited = (
+        _totals_by_customer(db, [customer.id for customer in customers], date_from, date_to)
+        if customers
+        else ({}, {})
+    )
+    result["items"] = [
+        CustomerBalance(
+            customer_id=customer.id,
+            name=customer.name,
+            invoiced_total=invoiced.get(customer.id) or 0.0,
+            credited_total=credited.get(customer.id) or 0.0,
+            balance=(invoiced.get(customer.id) or 0.0) - (credited.get(customer.id) or 0.0),
+        )
+        for customer in customers
+    ]
+    return result
+
+
+@router.get("/{customer_id}/ledger", response_model=CustomerLedger, summary="Date-ordered customer statement")
+def read_customer_ledger(
+    customer_id: int,
+    page: PageParams = Depends(),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    if not db.get(Customer, customer_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
+
+    # The statement covers archived documents too, like the totals below.
+    invoice, invoice_criteria = history_source(
+        Invoice,
+        [Invoice.customer_id == customer_id, *_date_range(Invoice.issued_at, date_from, date_to)],
+        include_archived=True,
+    )
+    credit_note, credit_note_criteria = history_source(
+        CreditNote,
+        [CreditNote.customer_id == customer_id, *_date_range(CreditNote.created_at, date_from, date_to)],
+        include_archived=True,
+    )
+    # entry_key interleaves invoice and credit note ids into one unique,
+    # integer tie-breaker so the union can be keyset-paginated by date.
+    invoices = select(
+        literal("invoice").label("entry_type"),
+        invoice.id.label("id"),
+        (invoice.id * 2).label("entry_key"),
+        invoice.job_id.label("job_id"),
+        invoice.issued_at.label("date"),
+        invoice.amount.label("amount"),
+        invoice.status.label("reference"),
+    ).where(*invoice_criteria)
+    credit_notes = select(
+        literal("credit_note").label("entry_type"),
+        credit_note.id.label("id"),
+        (credit_note.id * 2 + 1).label("entry_key"),
+        credit_note.job_id.label("job_id"),
+        credit_note.created_at.label("date"),
+        credit_note.amount.label("amount"),
+        credit_note.reason.label("reference"),
+    ).where(*credit_note_criteria)
+    ledger = union_all(invoices, credit_notes).subquery("ledger")
+
+    result = paginate(
+        db.query(ledger), page, sort="date", column=ledger.c.date, id_column=ledger.c.entry_key
+    )
+    invoiced, credited = _totals_by_customer(db, [customer_id], date_from, date_to)
+    invoiced_total = invoiced.get(customer_id) or 0.0
+    credited_total = credited.get(customer_id) or 0.0
+    return CustomerLedger(
+        items=result["items"],
+        next_cursor=result["next_cursor"],
+        customer_id=customer_id,
+        invoiced_total=invoiced_total,
+        credited_total=credited_total,
+        balance=invoiced_total - credited_total,
+    )
 
 
 @router.post("", response_model=CustomerRead, status_code=status.HTTP_201_CREATED)
@@ -26,11 +185,17 @@ def create_customer(customer_in: CustomerCreate, db: Session = Depends(get_db),
 
 
 @router.get("/{customer_id}", response_model=CustomerRead)
-def read_customer(customer_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+def read_customer(
+    customer_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
     customer = db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
-    return customer
+    return conditional_row(request, response, customer) or customer
 
 
 @router.put("/{customer_id}", response_model=CustomerRead)
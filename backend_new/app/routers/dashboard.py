@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..dependencies import get_current_admin
+from ..rollups import read_summary
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/summary", summary="Job counts and daily invoiced/credited totals")
+def read_dashboard_summary(
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    return read_summary(db, days)
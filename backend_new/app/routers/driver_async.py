@@ -0,0 +1,62 @@
+"""Async variants of the driver-facing routes, enabled by ``ASYNC_DATABASE``.
+
+Drivers poll these endpoints far more often than admins use the rest of the
+API, so they are the ones served without holding a threadpool thread while
+waiting on the database. The router is mounted ahead of the sync routers and
+shadows their handlers for the same paths.
+"""
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..conditional import check_conditional, collection_etag
+from ..database import get_async_db
+from ..dependencies import get_current_driver_async
+from ..models import DRIVER_JOB_ORDER, Job
+from ..schemas.driver import DriverJobSummary, DriverRead
+from ..schemas.job import JobRead
+from .jobs import apply_job_action
+
+router = APIRouter(tags=["drivers"])
+
+
+@router.get("/drivers/me", response_model=DriverRead)
+async def read_current_driver(driver=Depends(get_current_driver_async)):
+    return driver
+
+
+@router.get("/drivers/me/jobs", response_model=list[DriverJobSummary])
+async def read_current_driver_jobs(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    driver=Depends(get_current_driver_async),
+):
+    versions = (
+        await db.execute(
+            select(Job.id, Job.updated_at).where(Job.driver_id == driver.id).order_by(*DRIVER_JOB_ORDER)
+        )
+    ).all()
+    not_modified = check_conditional(request, response, collection_etag(request, versions))
+    if not_modified is not None:
+        return not_modified
+
+    result = await db.execute(
+        select(Job)
+        .where(Job.driver_id == driver.id)
+        .order_by(*DRIVER_JOB_ORDER)
+    )
+    return result.scalars().all()
+
+
+@router.post("/jobs/{job_id}/{action}", response_model=JobRead, tags=["jobs"])
+async def perform_action_on_job(
+    job_id: int,
+    action: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_driver=Depends(get_current_driver_async),
+):
+    job = apply_job_action(await db.get(Job, job_id), action, current_driver.id)
+    await db.commit()
+    await db.refresh(job)
+    return job
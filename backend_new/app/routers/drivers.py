@@ -1,19 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ..database import get_db
-from ..dependencies import get_current_admin, get_current_driver
-from ..models import Driver, Job
-from ..schemas.driver import DriverCreate, DriverJobSummary, DriverRead, DriverUpdate
-from ..security import get_password_hash
+from ..conditional import (
+    check_conditional,
+    collection_etag,
+    conditional_row,
+    paginate_conditional,
+)
+from ..database import get_db, get_read_db
+from ..cache import TTLCache
+from ..dependencies import (
+    Role,
+    get_current_admin,
+    get_current_driver,
+    get_event_hub,
+    get_password_hasher,
+    get_principal_cache,
+    invalidate_principal,
+)
+from ..events import EventHub
+from ..models import DRIVER_JOB_ORDER, Driver, Job
+from ..pagination import PageParams, sort_column
+from ..schemas.driver import (
+    DriverCreate,
+    DriverJobSummary,
+    DriverRead,
+    DriverSyncActionResult,
+    DriverSyncRequest,
+    DriverSyncResult,
+    DriverUpdate,
+)
+from ..schemas.pagination import Page
+from ..security import PasswordHasher
+from .jobs import apply_job_action
 
 router = APIRouter(prefix="/drivers", tags=["drivers"])
 
 
-@router.post("", response_model=DriverRead, status_code=status.HTTP_201_CREATED)
-def create_driver(
-    driver_in: DriverCreate, db: Session = Depends(get_db), admin=Depends(get_current_admin)
-):
+# Create and update are async so the password hash is awaited rather than
+# holding a threadpool worker; the database work then runs in the threadpool.
+def _insert_driver(db: Session, driver_in: DriverCreate, hashed_password: str) -> Driver:
     if db.query(Driver).filter(Driver.email == driver_in.email).first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Driver already exists")
     driver = Driver(
@@ -21,7 +53,7 @@ def create_driver(
         full_name=driver_in.full_name,
         phone=driver_in.phone,
         is_active=driver_in.is_active,
-        hashed_password=get_password_hash(driver_in.password),
+        hashed_password=hashed_password,
     )
     db.add(driver)
     db.commit()
@@ -29,9 +61,44 @@ def create_driver(
     return driver
 
 
-@router.get("", response_model=list[DriverRead])
-def list_drivers(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return db.query(Driver).all()
+@router.post("", response_model=DriverRead, status_code=status.HTTP_201_CREATED)
+async def create_driver(
+    driver_in: DriverCreate,
+    db: Session = Depends(get_db),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+    admin=Depends(get_current_admin),
+):
+    hashed_password = await hasher.hash(driver_in.password)
+    return await run_in_threadpool(_insert_driver, db, driver_in, hashed_password)
+
+
+DRIVER_SORT_FIELDS = ("id", "full_name", "email")
+
+
+@router.get("", response_model=Page[DriverRead])
+def list_drivers(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    sort: str = Query("id"),
+    is_active: Optional[bool] = None,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    column = sort_column(Driver, sort, DRIVER_SORT_FIELDS)
+    query = db.query(Driver)
+    if is_active is not None:
+        query = query.filter(Driver.is_active == is_active)
+    return paginate_conditional(
+        request,
+        response,
+        query,
+        page,
+        sort=sort,
+        column=column,
+        id_column=Driver.id,
+        version_column=Driver.updated_at,
+    )
 
 
 @router.get("/me", response_model=DriverRead)
@@ -41,32 +108,105 @@ def read_current_driver(driver=Depends(get_current_driver)):
 
 @router.get("/me/jobs", response_model=list[DriverJobSummary])
 def read_current_driver_jobs(
-    db: Session = Depends(get_db), driver=Depends(get_current_driver)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    driver=Depends(get_current_driver),
 ):
+    versions = db.execute(
+        select(Job.id, Job.updated_at).where(Job.driver_id == driver.id).order_by(*DRIVER_JOB_ORDER)
+    ).all()
+    not_modified = check_conditional(request, response, collection_etag(request, versions))
+    if not_modified is not None:
+        return not_modified
+
     jobs = (
         db.query(Job)
         .filter(Job.driver_id == driver.id)
-        .order_by(Job.scheduled_at.is_(None), Job.scheduled_at)
+        .order_by(*DRIVER_JOB_ORDER)
         .all()
     )
     return jobs
 
 
+@router.get("/me/events", summary="Stream job assignment events for the current driver")
+async def stream_current_driver_events(
+    event_hub: EventHub = Depends(get_event_hub), driver=Depends(get_current_driver)
+):
+    # The request-scoped session is released before streaming starts, so an
+    # idle stream holds no database connection, only a queue and a timer.
+    return StreamingResponse(
+        event_hub.stream(driver.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+MAX_SYNC_ACTIONS = 500
+
+
+def _action_time(client_timestamp: Optional[datetime]) -> datetime:
+    now = datetime.utcnow()
+    if client_timestamp is None:
+        return now
+    if client_timestamp.tzinfo is not None:
+        client_timestamp = client_timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    # Device clocks drift; never record an action as happening in the future.
+    return min(client_timestamp, now)
+
+
+@router.post("/me/sync", response_model=DriverSyncResult, summary="Apply queued offline job actions")
+def sync_current_driver_actions(
+    sync_in: DriverSyncRequest, db: Session = Depends(get_db), driver=Depends(get_current_driver)
+):
+    if len(sync_in.actions) > MAX_SYNC_ACTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_SYNC_ACTIONS} actions per sync",
+        )
+
+    job_ids = {item.job_id for item in sync_in.actions}
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_(job_ids))} if job_ids else {}
+
+    results = []
+    for index, item in enumerate(sync_in.actions):
+        try:
+            apply_job_action(
+                jobs.get(item.job_id), item.action, driver.id, _action_time(item.client_timestamp)
+            )
+        except HTTPException as exc:
+            results.append(
+                DriverSyncActionResult(index=index, job_id=item.job_id, status="error", detail=exc.detail)
+            )
+            continue
+        results.append(DriverSyncActionResult(index=index, job_id=item.job_id, status="applied"))
+
+    db.commit()
+    own_jobs = [job for job_id, job in sorted(jobs.items()) if job.driver_id == driver.id]
+    return DriverSyncResult(results=results, jobs=own_jobs)
+
+
 @router.get("/{driver_id}", response_model=DriverRead)
-def read_driver(driver_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+def read_driver(
+    driver_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
     driver = db.get(Driver, driver_id)
     if not driver:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Driver not found")
-    return driver
+    return conditional_row(request, response, driver) or driver
 
 
-@router.put("/{driver_id}", response_model=DriverRead)
-def update_driver(
+def _update_driver(
+    db: Session,
+    cache: TTLCache,
     driver_id: int,
     driver_in: DriverUpdate,
-    db: Session = Depends(get_db),
-    admin=Depends(get_current_admin),
-):
+    hashed_password: Optional[str],
+) -> Driver:
     driver = db.get(Driver, driver_id)
     if not driver:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Driver not found")
@@ -77,20 +217,41 @@ def update_driver(
         driver.phone = driver_in.phone
     if driver_in.is_active is not None:
         driver.is_active = driver_in.is_active
-    if driver_in.password:
-        driver.hashed_password = get_password_hash(driver_in.password)
+    if hashed_password is not None:
+        driver.hashed_password = hashed_password
 
     db.add(driver)
     db.commit()
+    invalidate_principal(cache, Role.DRIVER, driver.email)
     db.refresh(driver)
     return driver
 
 
+@router.put("/{driver_id}", response_model=DriverRead)
+async def update_driver(
+    driver_id: int,
+    driver_in: DriverUpdate,
+    db: Session = Depends(get_db),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+    cache: TTLCache = Depends(get_principal_cache),
+    admin=Depends(get_current_admin),
+):
+    hashed_password = await hasher.hash(driver_in.password) if driver_in.password else None
+    return await run_in_threadpool(_update_driver, db, cache, driver_id, driver_in, hashed_password)
+
+
 @router.delete("/{driver_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_driver(driver_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+def delete_driver(
+    driver_id: int,
+    db: Session = Depends(get_db),
+    cache: TTLCache = Depends(get_principal_cache),
+    admin=Depends(get_current_admin),
+):
     driver = db.get(Driver, driver_id)
     if not driver:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Driver not found")
+    email = driver.email
     db.delete(driver)
     db.commit()
+    invalidate_principal(cache, Role.DRIVER, email)
     return None
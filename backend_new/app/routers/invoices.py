@@ -1,17 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from ..database import get_db
-from ..dependencies import get_current_admin
+from ..archiving import get_with_archive, history_source
+from ..conditional import conditional_row, paginate_conditional
+from ..config import Settings
+from ..database import get_db, get_read_db
+from ..dependencies import get_current_admin, get_settings
+from ..exporting import export_format, export_response
+from ..fastpath import fast_page_response, list_query
+from ..invoicing import generate_invoices, rate_table
 from ..models import Invoice
-from ..schemas.invoice import InvoiceCreate, InvoiceRead, InvoiceUpdate
+from ..pagination import PageParams, sort_column
+from ..schemas.invoice import (
+    InvoiceCreate,
+    InvoiceGenerateRequest,
+    InvoiceGenerateResult,
+    InvoiceRead,
+    InvoiceUpdate,
+)
+from ..schemas.pagination import Page
+from ..tasks import enqueue, task_handler
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 
-@router.get("", response_model=list[InvoiceRead])
-def list_invoices(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return db.query(Invoice).all()
+INVOICE_SORT_FIELDS = ("id", "issued_at", "amount")
+
+GENERATE_INVOICES_TASK = "invoices.generate"
+
+
+def invoice_filters(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    customer_id: Optional[int] = None,
+    job_id: Optional[int] = None,
+    issued_from: Optional[datetime] = None,
+    issued_to: Optional[datetime] = None,
+) -> list:
+    criteria = []
+    if status_filter is not None:
+        criteria.append(Invoice.status == status_filter)
+    if customer_id is not None:
+        criteria.append(Invoice.customer_id == customer_id)
+    if job_id is not None:
+        criteria.append(Invoice.job_id == job_id)
+    if issued_from is not None:
+        criteria.append(Invoice.issued_at >= issued_from)
+    if issued_to is not None:
+        criteria.append(Invoice.issued_at < issued_to)
+    return criteria
+
+
+@router.get("", response_model=Page[InvoiceRead])
+def list_invoices(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    sort: str = Query("id"),
+    criteria: list = Depends(invoice_filters),
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    config: Settings = Depends(get_settings),
+    admin=Depends(get_current_admin),
+):
+    source, criteria = history_source(Invoice, criteria, include_archived)
+    column = sort_column(source, sort, INVOICE_SORT_FIELDS)
+    fast = config.FAST_LIST_SERIALIZATION
+    query = list_query(db, source, InvoiceRead, fast).filter(*criteria)
+    result = paginate_conditional(
+        request,
+        response,
+        query,
+        page,
+        sort=sort,
+        column=column,
+        id_column=source.id,
+        version_column=source.updated_at,
+    )
+    return fast_page_response(result, InvoiceRead, response) if fast else result
+
+
+@router.get("/export", summary="Stream invoices as NDJSON or CSV")
+def export_invoices(
+    fmt: str = Depends(export_format),
+    criteria: list = Depends(invoice_filters),
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    source, criteria = history_source(Invoice, criteria, include_archived)
+    columns = [getattr(source, field) for field in InvoiceRead.model_fields]
+    statement = select(*columns).where(*criteria).order_by(source.id)
+    return export_response(db.get_bind(), statement, fmt, "invoices")
 
 
 @router.post("", response_model=InvoiceRead, status_code=status.HTTP_201_CREATED)
@@ -27,12 +111,62 @@ def create_invoice(
     return invoice
 
 
+def _run_generation(db: Session, generate_in: InvoiceGenerateRequest) -> InvoiceGenerateResult:
+    started = time.perf_counter()
+    created, total = generate_invoices(
+        db,
+        rate_table(generate_in.default_rate, generate_in.customer_rates),
+        status=generate_in.status,
+        completed_before=generate_in.completed_before,
+    )
+    db.commit()
+    return InvoiceGenerateResult(
+        created=created,
+        total_amount=round(total, 2),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+
+
+@task_handler(GENERATE_INVOICES_TASK)
+def _generate_invoices_task(db: Session, **payload) -> None:
+    _run_generation(db, InvoiceGenerateRequest.model_validate(payload))
+
+
+@router.post(
+    "/generate",
+    response_model=InvoiceGenerateResult,
+    summary="Invoice every completed job that has no invoice yet",
+)
+def generate_invoices_for_completed_jobs(
+    generate_in: InvoiceGenerateRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    if generate_in.default_rate < 0 or any(rate < 0 for rate in generate_in.customer_rates.values()):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rates must not be negative")
+    if generate_in.background:
+        payload = generate_in.model_dump(mode="json", exclude={"background"})
+        task = enqueue(db, GENERATE_INVOICES_TASK, **payload)
+        db.commit()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return InvoiceGenerateResult(task_id=task.id)
+    return _run_generation(db, generate_in)
+
+
 @router.get("/{invoice_id}", response_model=InvoiceRead)
-def read_invoice(invoice_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    invoice = db.get(Invoice, invoice_id)
+def read_invoice(
+    invoice_id: int,
+    request: Request,
+    response: Response,
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    invoice = get_with_archive(db, Invoice, invoice_id, include_archived)
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
-    return invoice
+    return conditional_row(request, response, invoice) or invoice
 
 
 @router.put("/{invoice_id}", response_model=InvoiceRead)
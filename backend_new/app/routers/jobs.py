@@ -1,23 +1,117 @@
-from datetime import datetime
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from ..database import get_db
-from ..dependencies import get_current_admin, get_current_driver
-from ..models import Job, JobStatus
-from ..schemas.job import JobCreate, JobRead, JobUpdate
+from ..archiving import ARCHIVE_JOBS_TASK, archive_cutoff, get_with_archive, history_source
+from ..conditional import conditional_row, paginate_conditional
+from ..config import Settings
+from ..database import get_db, get_read_db
+from ..dependencies import get_current_admin, get_current_driver, get_event_hub, get_settings
+from ..dispatch import dispatch_pending_jobs
+from ..events import EventHub, publish_job_change
+from ..exporting import export_format, export_response
+from ..fastpath import fast_page_response, list_query
+from ..models import Customer, Driver, Job, JobStatus
+from ..pagination import PageParams, sort_column
+from ..rollups import add_job, apply_deltas
+from ..schemas.job import (
+    JobArchiveRequest,
+    JobArchiveResult,
+    JobBulkItemResult,
+    JobBulkResult,
+    JobBulkUpdate,
+    JobCreate,
+    JobDispatchAssignment,
+    JobDispatchRequest,
+    JobDispatchResult,
+    JobDispatchSkipped,
+    JobRead,
+    JobUpdate,
+)
+from ..schemas.pagination import Page
+from ..tasks import enqueue
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
+JOB_SORT_FIELDS = ("id", "scheduled_at", "completed_at")
 
-@router.get("", response_model=list[JobRead])
-def list_jobs(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return db.query(Job).all()
+
+def job_filters(
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    driver_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    scheduled_from: Optional[datetime] = None,
+    scheduled_to: Optional[datetime] = None,
+) -> list:
+    criteria = []
+    if status_filter is not None:
+        criteria.append(Job.status == status_filter)
+    if driver_id is not None:
+        criteria.append(Job.driver_id == driver_id)
+    if customer_id is not None:
+        criteria.append(Job.customer_id == customer_id)
+    if scheduled_from is not None:
+        criteria.append(Job.scheduled_at >= scheduled_from)
+    if scheduled_to is not None:
+        criteria.append(Job.scheduled_at < scheduled_to)
+    return criteria
+
+
+@router.get("", response_model=Page[JobRead])
+def list_jobs(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    sort: str = Query("id"),
+    criteria: list = Depends(job_filters),
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    config: Settings = Depends(get_settings),
+    admin=Depends(get_current_admin),
+):
+    source, criteria = history_source(Job, criteria, include_archived)
+    column = sort_column(source, sort, JOB_SORT_FIELDS)
+    fast = config.FAST_LIST_SERIALIZATION
+    query = list_query(db, source, JobRead, fast).filter(*criteria)
+    result = paginate_conditional(
+        request,
+        response,
+        query,
+        page,
+        sort=sort,
+        column=column,
+        id_column=source.id,
+        version_column=source.updated_at,
+    )
+    return fast_page_response(result, JobRead, response) if fast else result
+
+
+@router.get("/export", summary="Stream jobs as NDJSON or CSV")
+def export_jobs(
+    fmt: str = Depends(export_format),
+    criteria: list = Depends(job_filters),
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    source, criteria = history_source(Job, criteria, include_archived)
+    columns = [getattr(source, field) for field in JobRead.model_fields]
+    statement = select(*columns).where(*criteria).order_by(source.id)
+    return export_response(db.get_bind(), statement, fmt, "jobs")
 
 
 @router.post("", response_model=JobRead, status_code=status.HTTP_201_CREATED)
-def create_job(job_in: JobCreate, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+def create_job(
+    job_in: JobCreate,
+    db: Session = Depends(get_db),
+    event_hub: EventHub = Depends(get_event_hub),
+    admin=Depends(get_current_admin),
+):
     try:
         status_value = JobStatus(job_in.status) if job_in.status else JobStatus.PENDING
     except ValueError as exc:
@@ -35,15 +129,252 @@ def create_job(job_in: JobCreate, db: Session = Depends(get_db), admin=Depends(g
     db.add(job)
     db.commit()
     db.refresh(job)
+    publish_job_change(event_hub, job)
     return job
 
 
+MAX_BULK_JOBS = 5000
+
+
+def _check_bulk_size(items: list) -> None:
+    if not items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No jobs supplied")
+    if len(items) > MAX_BULK_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_JOBS} jobs per request",
+        )
+
+
+def _existing_ids(db: Session, column, ids) -> set[int]:
+    wanted = {value for value in ids if value is not None}
+    if not wanted:
+        return set()
+    return set(db.scalars(select(column).where(column.in_(wanted))))
+
+
+def _bulk_item_error(values: dict, drivers: set[int], customers: set[int]) -> Optional[str]:
+    if values.get("status") is not None:
+        try:
+            JobStatus(values["status"])
+        except ValueError:
+            return "Invalid job status"
+    if values.get("driver_id") is not None and values["driver_id"] not in drivers:
+        return "Driver not found"
+    if "customer_id" in values and values["customer_id"] not in customers:
+        return "Customer not found"
+    return None
+
+
+def _publish_bulk_changes(
+    event_hub: EventHub, db: Session, drivers: dict[int, tuple[Optional[int], Optional[int]]]
+) -> None:
+    """Publish committed bulk writes; ``drivers`` maps job ids to their (previous, new) driver ids."""
+    # As in dispatch_jobs, only jobs with a listening driver are loaded back.
+    notify = {
+        job_id: previous
+        for job_id, (previous, new) in drivers.items()
+        if any(event_hub.is_subscribed(driver_id) for driver_id in {previous, new} - {None})
+    }
+    if notify:
+        for job in db.scalars(select(Job).where(Job.id.in_(list(notify)))):
+            publish_job_change(event_hub, job, notify[job.id])
+
+
+def _bulk_result(results: list[JobBulkItemResult]) -> JobBulkResult:
+    results.sort(key=lambda item: item.index)
+    failed = sum(1 for item in results if item.status == "error")
+    return JobBulkResult(succeeded=len(results) - failed, failed=failed, results=results)
+
+
+@router.post("/bulk", response_model=JobBulkResult, summary="Create many jobs in one transaction")
+def create_jobs_bulk(
+    jobs_in: list[JobCreate],
+    db: Session = Depends(get_db),
+    event_hub: EventHub = Depends(get_event_hub),
+    admin=Depends(get_current_admin),
+):
+    _check_bulk_size(jobs_in)
+    drivers = _existing_ids(db, Driver.id, (job_in.driver_id for job_in in jobs_in))
+    customers = _existing_ids(db, Customer.id, (job_in.customer_id for job_in in jobs_in))
+
+    results: list[JobBulkItemResult] = []
+    rows, row_indexes = [], []
+    for index, job_in in enumerate(jobs_in):
+        values = job_in.model_dump()
+        error = _bulk_item_error(values, drivers, customers)
+        if error:
+            results.append(JobBulkItemResult(index=index, status="error", detail=error))
+            continue
+        values["status"] = JobStatus(values["status"]) if values["status"] else JobStatus.PENDING
+        rows.append(values)
+        row_indexes.append(index)
+
+    if rows:
+        statement = insert(Job).returning(Job.id, sort_by_parameter_order=True)
+        job_ids = db.scalars(statement, rows).all()
+        deltas = defaultdict(float)
+        for row in rows:
+            add_job(deltas, row["status"], row["driver_id"])
+        apply_deltas(db.connection(), deltas)
+        db.commit()
+        results.extend(
+            JobBulkItemResult(index=index, id=job_id, status="created")
+            for index, job_id in zip(row_indexes, job_ids)
+        )
+        _publish_bulk_changes(
+            event_hub, db, {job_id: (None, row["driver_id"]) for job_id, row in zip(job_ids, rows)}
+        )
+    return _bulk_result(results)
+
+
+@router.patch("/bulk", response_model=JobBulkResult, summary="Update many jobs in one transaction")
+def update_jobs_bulk(
+    jobs_in: list[JobBulkUpdate],
+    db: Session = Depends(get_db),
+    event_hub: EventHub = Depends(get_event_hub),
+    admin=Depends(get_current_admin),
+):
+    _check_bulk_size(jobs_in)
+    requested = {job_in.id for job_in in jobs_in}
+    current = {
+        row.id: row
+        for row in db.execute(select(Job.id, Job.status, Job.driver_id).where(Job.id.in_(requested)))
+    }
+    drivers = _existing_ids(db, Driver.id, (job_in.driver_id for job_in in jobs_in))
+    customers = _existing_ids(db, Customer.id, (job_in.customer_id for job_in in jobs_in))
+
+    results: list[JobBulkItemResult] = []
+    rows = []
+    for index, job_in in enumerate(jobs_in):
+        # Matches update_job: fields sent as null are left unchanged.
+        values = {
+            field: value
+            for field, value in job_in.model_dump(exclude_unset=True).items()
+            if value is not None
+        }
+        if job_in.id not in current:
+            error = "Job not found"
+        else:
+            error = _bulk_item_error(values, drivers, customers)
+        if error:
+            results.append(JobBulkItemResult(index=index, id=job_in.id, status="error", detail=error))
+            continue
+        if "status" in values:
+            values["status"] = JobStatus(values["status"])
+        rows.append(values)
+        results.append(JobBulkItemResult(index=index, id=job_in.id, status="updated"))
+
+    if rows:
+        # Bulk UPDATE bypasses the unit of work, so dashboard counters are
+        # adjusted here from the pre-update state of each row.
+        deltas = defaultdict(float)
+        state = {job_id: (row.status, row.driver_id) for job_id, row in current.items()}
+        for row in rows:
+            old_status, old_driver = state[row["id"]]
+            new_status, new_driver = row.get("status", old_status), row.get("driver_id", old_driver)
+            add_job(deltas, old_status, old_driver, -1)
+            add_job(deltas, new_status, new_driver)
+            state[row["id"]] = (new_status, new_driver)
+        db.execute(update(Job), rows)
+        apply_deltas(db.connection(), deltas)
+        db.commit()
+        written = {row["id"] for row in rows}
+        _publish_bulk_changes(
+            event_hub, db, {job_id: (current[job_id].driver_id, state[job_id][1]) for job_id in written}
+        )
+    return _bulk_result(results)
+
+
+@router.post(
+    "/dispatch", response_model=JobDispatchResult, summary="Assign unassigned pending jobs to active drivers"
+)
+def dispatch_jobs(
+    dispatch_in: JobDispatchRequest,
+    db: Session = Depends(get_db),
+    event_hub: EventHub = Depends(get_event_hub),
+    admin=Depends(get_current_admin),
+):
+    if dispatch_in.conflict_minutes < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="conflict_minutes must not be negative"
+        )
+    if dispatch_in.max_jobs_per_driver is not None and dispatch_in.max_jobs_per_driver < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="max_jobs_per_driver must be positive"
+        )
+    started = time.perf_counter()
+    assigned, unassigned = dispatch_pending_jobs(
+        db,
+        window_start=dispatch_in.window_start,
+        window_end=dispatch_in.window_end,
+        conflict_window=timedelta(minutes=dispatch_in.conflict_minutes),
+        max_jobs_per_driver=dispatch_in.max_jobs_per_driver,
+        dry_run=dispatch_in.dry_run,
+    )
+    if not dispatch_in.dry_run:
+        db.commit()
+        # Only jobs whose driver has an open event stream are loaded back for publishing.
+        notify = [item.job_id for item in assigned if event_hub.is_subscribed(item.driver_id)]
+        if notify:
+            for job in db.scalars(select(Job).where(Job.id.in_(notify))):
+                publish_job_change(event_hub, job)
+    return JobDispatchResult(
+        assigned=len(assigned),
+        unassigned=len(unassigned),
+        dry_run=dispatch_in.dry_run,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+        assignments=[JobDispatchAssignment(**vars(item)) for item in assigned],
+        skipped=[JobDispatchSkipped(**vars(item)) for item in unassigned],
+    )
+
+
+@router.post(
+    "/archive",
+    response_model=JobArchiveResult,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Move old completed and cancelled jobs to the archive tables",
+)
+def archive_old_jobs(
+    archive_in: JobArchiveRequest,
+    db: Session = Depends(get_db),
+    config: Settings = Depends(get_settings),
+    admin=Depends(get_current_admin),
+):
+    days = archive_in.older_than_days
+    if days is None:
+        days = config.ARCHIVE_AFTER_DAYS
+    batch_size = archive_in.batch_size or config.ARCHIVE_BATCH_SIZE
+    if days < 0 or batch_size < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="older_than_days must not be negative and batch_size must be positive",
+        )
+    cutoff = archive_cutoff(days)
+    task = enqueue(
+        db,
+        ARCHIVE_JOBS_TASK,
+        cutoff=cutoff.isoformat(),
+        batch_size=batch_size,
+        max_batches=config.ARCHIVE_MAX_BATCHES_PER_TASK,
+    )
+    db.commit()
+    return JobArchiveResult(task_id=task.id, cutoff=cutoff)
+
+
 @router.get("/{job_id}", response_model=JobRead)
-def read_job(job_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    job = db.get(Job, job_id)
+def read_job(
+    job_id: int,
+    request: Request,
+    response: Response,
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    job = get_with_archive(db, Job, job_id, include_archived)
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-    return job
+    return conditional_row(request, response, job) or job
 
 
 @router.put("/{job_id}", response_model=JobRead)
@@ -51,11 +382,13 @@ def update_job(
     job_id: int,
     job_in: JobUpdate,
     db: Session = Depends(get_db),
+    event_hub: EventHub = Depends(get_event_hub),
     admin=Depends(get_current_admin),
 ):
     job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    previous_driver_id = job.driver_id
 
     if job_in.title is not None:
         job.title = job_in.title
@@ -78,47 +411,61 @@ def update_job(
     db.add(job)
     db.commit()
     db.refresh(job)
+    publish_job_change(event_hub, job, previous_driver_id)
     return job
 
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_job(job_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+def delete_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    event_hub: EventHub = Depends(get_event_hub),
+    admin=Depends(get_current_admin),
+):
     job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    snapshot = JobRead.model_validate(job)
     db.delete(job)
     db.commit()
+    publish_job_change(event_hub, snapshot, snapshot.driver_id, deleted=True)
     return None
 
 
-@router.post("/{job_id}/{action}", response_model=JobRead)
-def perform_action_on_job(
-    job_id: int,
-    action: str,
-    db: Session = Depends(get_db),
-    current_driver=Depends(get_current_driver),
-):
-    job = db.get(Job, job_id)
+def apply_job_action(
+    job: Optional[Job], action: str, driver_id: int, at: Optional[datetime] = None
+) -> Job:
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-    if job.driver_id != current_driver.id:
+    if job.driver_id != driver_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Job not assigned to driver")
 
+    at = at or datetime.utcnow()
     normalized_action = action.lower()
     if normalized_action == "start":
         job.status = JobStatus.IN_PROGRESS
-        job.scheduled_at = job.scheduled_at or datetime.utcnow()
+        job.scheduled_at = job.scheduled_at or at
     elif normalized_action == "complete":
         job.status = JobStatus.COMPLETED
-        job.completed_at = datetime.utcnow()
+        job.completed_at = at
     elif normalized_action == "cancel":
         job.status = JobStatus.CANCELLED
-        job.completed_at = datetime.utcnow()
+        job.completed_at = at
     elif normalized_action == "acknowledge":
         job.status = JobStatus.ASSIGNED
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported action")
+    return job
+
 
+@router.post("/{job_id}/{action}", response_model=JobRead)
+def perform_action_on_job(
+    job_id: int,
+    action: str,
+    db: Session = Depends(get_db),
+    current_driver=Depends(get_current_driver),
+):
+    job = apply_job_action(db.get(Job, job_id), action, current_driver.id)
     db.add(job)
     db.commit()
     db.refresh(job)
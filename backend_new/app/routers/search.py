@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..dependencies import get_current_admin
+from ..pagination import PageParams, paginate
+from ..schemas.pagination import Page
+from ..schemas.search import SearchHit
+from ..search import search_hits
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=Page[SearchHit], summary="Ranked full-text search over jobs and customers")
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = Query(None, pattern="^(job|customer)$"),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    hits = search_hits(db.get_bind().dialect.name, q, kind)
+    if hits is None:
+        return {"items": [], "next_cursor": None}
+    return paginate(db.query(hits), page, sort="score", column=hits.c.score, id_column=hits.c.entry_key)
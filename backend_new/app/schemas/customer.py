@@ -1,7 +1,10 @@
+from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
 
+from .pagination import Page
+
 
 class CustomerBase(BaseModel):
     name: str
@@ -25,3 +28,29 @@ class CustomerRead(CustomerBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+
+
+class CustomerBalance(BaseModel):
+    customer_id: int
+    name: str
+    invoiced_total: float
+    credited_total: float
+    balance: float
+
+
+class LedgerEntry(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    entry_type: str
+    id: int
+    job_id: int
+    date: datetime
+    amount: float
+    reference: Optional[str] = None
+
+
+class CustomerLedger(Page[LedgerEntry]):
+    customer_id: int
+    invoiced_total: float
+    credited_total: float
+    balance: float
@@ -42,3 +42,25 @@ class DriverJobSummary(BaseModel):
     status: str
     scheduled_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+
+
+class DriverSyncAction(BaseModel):
+    job_id: int
+    action: str
+    client_timestamp: Optional[datetime] = None
+
+
+class DriverSyncRequest(BaseModel):
+    actions: list[DriverSyncAction]
+
+
+class DriverSyncActionResult(BaseModel):
+    index: int
+    job_id: int
+    status: str
+    detail: Optional[str] = None
+
+
+class DriverSyncResult(BaseModel):
+    results: list[DriverSyncActionResult]
+    jobs: list[JobRead]
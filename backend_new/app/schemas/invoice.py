@@ -28,3 +28,18 @@ class InvoiceRead(InvoiceBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+
+
+class InvoiceGenerateRequest(BaseModel):
+    default_rate: float
+    customer_rates: dict[int, float] = {}
+    status: str = "draft"
+    completed_before: Optional[datetime] = None
+    background: bool = False
+
+
+class InvoiceGenerateResult(BaseModel):
+    created: int = 0
+    total_amount: float = 0.0
+    elapsed_ms: float = 0.0
+    task_id: Optional[int] = None
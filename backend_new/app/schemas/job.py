@@ -32,3 +32,58 @@ class JobRead(JobBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+
+
+class JobBulkUpdate(JobUpdate):
+    id: int
+
+
+class JobBulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: str
+    detail: Optional[str] = None
+
+
+class JobBulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[JobBulkItemResult]
+
+
+class JobDispatchRequest(BaseModel):
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+    conflict_minutes: int = 60
+    max_jobs_per_driver: Optional[int] = None
+    dry_run: bool = False
+
+
+class JobDispatchAssignment(BaseModel):
+    job_id: int
+    driver_id: int
+    driver_load: int
+
+
+class JobDispatchSkipped(BaseModel):
+    job_id: int
+    reason: str
+
+
+class JobDispatchResult(BaseModel):
+    assigned: int
+    unassigned: int
+    dry_run: bool
+    elapsed_ms: float
+    assignments: list[JobDispatchAssignment]
+    skipped: list[JobDispatchSkipped]
+
+
+class JobArchiveRequest(BaseModel):
+    older_than_days: Optional[int] = None
+    batch_size: Optional[int] = None
+
+
+class JobArchiveResult(BaseModel):
+    task_id: int
+    cutoff: datetime
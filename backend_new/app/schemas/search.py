@@ -0,0 +1,10 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class SearchHit(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    kind: str
+    id: int
+    title: str
+    score: float
@@ -0,0 +1,156 @@
+"""Full-text search over job titles/descriptions and customer names/emails/addresses.
+
+SQLite keeps a ``search_index`` FTS5 table in sync with triggers on ``jobs``
+and ``customers``, so bulk Core statements are indexed as well as ORM writes.
+Rows are keyed like the customer ledger: ``rowid`` is ``id * 2`` for jobs and
+``id * 2 + 1`` for customers. PostgreSQL needs no side table: GIN indexes on
+the ``to_tsvector`` of each document are always current and are matched by
+the same expressions at query time.
+
+Hits expose ``score`` where lower is better on both backends, so results are
+keyset-paginated with the shared helpers ordered by ``(score, entry_key)``.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import Float, Integer, String, event, func, literal, literal_column, select, text, union_all
+
+from .models import Base
+
+JOB = "job"
+CUSTOMER = "customer"
+
+TS_CONFIG = "'english'"
+JOB_DOCUMENT = "coalesce(title, '') || ' ' || coalesce(description, '')"
+CUSTOMER_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(address, '')"
+
+_JOB_ROW = "new.id * 2, new.title, coalesce(new.description, '')"
+_CUSTOMER_ROW = "new.id * 2 + 1, new.name, coalesce(new.email, '') || ' ' || coalesce(new.address, '')"
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index "
+    "USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')",
+    # Title matches weigh twice as much as body matches.
+    "INSERT INTO search_index(search_index, rank) VALUES ('rank', 'bm25(2.0, 1.0)')",
+    "CREATE TRIGGER IF NOT EXISTS jobs_search_insert AFTER INSERT ON jobs BEGIN "
+    f"INSERT INTO search_index(rowid, title, body) VALUES ({_JOB_ROW}); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_search_update AFTER UPDATE OF title, description ON jobs BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 2; "
+    f"INSERT INTO search_index(rowid, title, body) VALUES ({_JOB_ROW}); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_search_delete AFTER DELETE ON jobs BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 2; END",
+    "CREATE TRIGGER IF NOT EXISTS customers_search_insert AFTER INSERT ON customers BEGIN "
+    f"INSERT INTO search_index(rowid, title, body) VALUES ({_CUSTOMER_ROW}); END",
+    "CREATE TRIGGER IF NOT EXISTS customers_search_update AFTER UPDATE OF name, email, address ON customers "
+    "BEGIN DELETE FROM search_index WHERE rowid = old.id * 2 + 1; "
+    f"INSERT INTO search_index(rowid, title, body) VALUES ({_CUSTOMER_ROW}); END",
+    "CREATE TRIGGER IF NOT EXISTS customers_search_delete AFTER DELETE ON customers BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 2 + 1; END",
+)
+
+SQLITE_TRIGGERS = (
+    "jobs_search_insert",
+    "jobs_search_update",
+    "jobs_search_delete",
+    "customers_search_insert",
+    "customers_search_update",
+    "customers_search_delete",
+)
+
+POSTGRES_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_jobs_search ON jobs USING gin (to_tsvector({TS_CONFIG}, {JOB_DOCUMENT}))",
+    "CREATE INDEX IF NOT EXISTS ix_customers_search ON customers "
+    f"USING gin (to_tsvector({TS_CONFIG}, {CUSTOMER_DOCUMENT}))",
+)
+
+
+def install_search_index(connection) -> None:
+    if connection.dialect.name == "sqlite":
+        for statement in SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+    elif connection.dialect.name == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def drop_search_triggers(connection) -> None:
+    """Stop incremental indexing on SQLite ahead of a bulk load; follow with a rebuild and reinstall."""
+    if connection.dialect.name == "sqlite":
+        for trigger in SQLITE_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def rebuild_search_index(connection) -> None:
+    """Re-index every job and customer (SQLite only; PostgreSQL indexes are never stale)."""
+    if connection.dialect.name != "sqlite":
+        return
+    connection.exec_driver_sql("DELETE FROM search_index")
+    connection.exec_driver_sql(
+        "INSERT INTO search_index(rowid, title, body) "
+        "SELECT id * 2, title, coalesce(description, '') FROM jobs"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO search_index(rowid, title, body) "
+        "SELECT id * 2 + 1, name, coalesce(email, '') || ' ' || coalesce(address, '') FROM customers"
+    )
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw) -> None:
+    install_search_index(connection)
+
+
+def _terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q)
+
+
+def _fts5_match(terms: list[str]) -> str:
+    # Every term is quoted so user input can never be parsed as FTS5 syntax;
+    # the last one is a prefix so results follow the user as they type.
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def _sqlite_hits(terms: list[str]):
+    return (
+        text(
+            "SELECT CASE rowid % 2 WHEN 0 THEN 'job' ELSE 'customer' END AS kind, "
+            "rowid / 2 AS id, rowid AS entry_key, title, rank AS score "
+            "FROM search_index WHERE search_index MATCH :match"
+        )
+        .bindparams(match=_fts5_match(terms))
+        .columns(kind=String, id=Integer, entry_key=Integer, title=String, score=Float)
+    )
+
+
+def _postgres_hits(terms: list[str]):
+    query = func.plainto_tsquery(literal_column(TS_CONFIG), " ".join(terms))
+
+    def branch(table: str, kind: str, title: str, document: str, offset: int):
+        vector = literal_column(f"to_tsvector({TS_CONFIG}, {document})")
+        return (
+            select(
+                literal(kind).label("kind"),
+                literal_column("id", Integer).label("id"),
+                (literal_column("id", Integer) * 2 + offset).label("entry_key"),
+                literal_column(title, String).label("title"),
+                (-func.ts_rank(vector, query)).label("score"),
+            )
+            .select_from(text(table))
+            .where(vector.op("@@")(query))
+        )
+
+    return union_all(
+        branch("jobs", JOB, "title", JOB_DOCUMENT, 0),
+        branch("customers", CUSTOMER, "name", CUSTOMER_DOCUMENT, 1),
+    )
+
+
+def search_hits(dialect: str, q: str, kind: Optional[str] = None):
+    """Return a ``hits`` subquery of ``(kind, id, entry_key, title, score)``, or ``None`` for an empty query."""
+    terms = _terms(q)
+    if not terms:
+        return None
+    hits = (_postgres_hits(terms) if dialect == "postgresql" else _sqlite_hits(terms)).subquery("hits")
+    if kind is not None:
+        hits = select(hits).where(hits.c.kind == kind).subquery("hits")
+    return hits
@@ -1,33 +1,124 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 
-from .config import settings
-
+from .config import Settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+class PasswordHasherBusy(RuntimeError):
+    """Raised when too many password operations are already queued."""
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """bcrypt for request handlers, awaited so no worker thread waits on it.
+
+    bcrypt is CPU bound and holds the GIL, so with ``workers`` > 0 it runs in a
+    dedicated process pool, started on first use; the bounded semaphore sheds
+    load instead of queueing without limit. With no workers it runs in the
+    threadpool.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._pending = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _discard_executor(self, broken: ProcessPoolExecutor) -> None:
+        # A pool whose worker died is unusable; the next submit starts a new one.
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+
+    def _submit(self, func, *args) -> Future:
+        if not self._pending.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing queue is full")
+        executor = None
+        try:
+            executor = self._get_executor()
+            future = executor.submit(func, *args)
+        except BaseException as exc:
+            self._pending.release()
+            if isinstance(exc, BrokenProcessPool):
+                self._discard_executor(executor)
+            raise
+
+        def done(finished: Future) -> None:
+            self._pending.release()
+            if not finished.cancelled() and isinstance(finished.exception(), BrokenProcessPool):
+                self._discard_executor(executor)
+
+        future.add_done_callback(done)
+        return future
+
+    async def _run(self, func, *args):
+        if self.workers <= 0:
+            return await run_in_threadpool(func, *args)
+        try:
+            return await asyncio.wrap_future(self._submit(func, *args))
+        except BrokenProcessPool:
+            return await asyncio.wrap_future(self._submit(func, *args))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+
+# Run bcrypt in the calling thread, for scripts such as seeding; request
+# handlers await the application's PasswordHasher instead.
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return _hash(password)
+
+
 def create_access_token(
     subject: str,
     role: str,
     *,
+    config: Settings,
     subject_id: Optional[int] = None,
     expires_delta: Optional[timedelta] = None,
 ) -> str:
 
     if expires_delta is None:
-        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expires_delta = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {
         "sub": subject,
         "role": role,
@@ -36,12 +127,12 @@ def create_access_token(
     if subject_id is not None:
         to_encode["sub_id"] = subject_id
 
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(to_encode, config.SECRET_KEY, algorithm=config.ALGORITHM)
 
 
-def decode_token(token: str) -> dict:
+def decode_token(token: str, config: Settings) -> dict:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
         return payload
     except JWTError as exc:  # pragma: no cover - simple pass-through
         raise ValueError("Invalid token") from exc
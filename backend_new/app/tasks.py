@@ -0,0 +1,265 @@
+"""Durable background tasks executed by an in-process worker pool.
+
+:func:`enqueue` adds a row to ``tasks`` in the caller's session, so a task is
+stored if and only if the write that produced it commits. Worker threads claim
+ready rows with a conditional ``UPDATE`` (safe across processes sharing the
+database), run the registered handler in a fresh session and commit its effects
+together with the ``done`` marker. Failures are retried with exponential
+backoff until ``max_attempts``; rows left ``running`` past the lease by a
+crashed worker are claimed again while attempts remain and failed otherwise.
+Finished rows are purged once they are ``TASK_RETENTION_DAYS`` old.
+"""
+import logging
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import and_, delete, event, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from .config import Settings
+from .database import database
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+MAX_RETRY_DELAY_SECONDS = 300.0
+LEASE_EXPIRED = "Lease expired on the final attempt"
+
+_handlers: dict[str, Callable] = {}
+# Started pools in this process, woken when a session commits new tasks.
+_running_pools: "weakref.WeakSet[TaskWorkerPool]" = weakref.WeakSet()
+
+
+def task_handler(name: str):
+    """Register ``func(db, **payload)`` as the handler for tasks called ``name``."""
+
+    def register(func: Callable) -> Callable:
+        _handlers[name] = func
+        return func
+
+    return register
+
+
+def enqueue(db, name: str, max_attempts: Optional[int] = None, **payload) -> Task:
+    """Add a task to ``db``; it becomes visible to workers when the session commits."""
+    max_attempts = max_attempts or database.settings.TASK_MAX_ATTEMPTS
+    task = Task(name=name, payload=payload, max_attempts=max_attempts)
+    db.add(task)
+    db.info["tasks_enqueued"] = True
+    return task
+
+
+def _retry_delay(base_seconds: float, attempts: int) -> timedelta:
+    delay = base_seconds * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, MAX_RETRY_DELAY_SECONDS))
+
+
+class TaskWorkerPool:
+    def __init__(
+        self,
+        session_factory,
+        workers: int,
+        poll_seconds: float,
+        lease_seconds: float,
+        retention_days: float,
+        cleanup_interval_seconds: float,
+        retry_base_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.retention_days = retention_days
+        self.cleanup_interval_seconds = cleanup_interval_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.succeeded = 0
+        self.failed_attempts = 0
+        self._threads: list[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._next_cleanup = 0.0
+
+    @classmethod
+    def from_settings(cls, session_factory, config: Settings) -> "TaskWorkerPool":
+        return cls(
+            session_factory,
+            workers=config.TASK_WORKERS,
+            poll_seconds=config.TASK_POLL_SECONDS,
+            lease_seconds=config.TASK_LEASE_SECONDS,
+            retention_days=config.TASK_RETENTION_DAYS,
+            cleanup_interval_seconds=config.TASK_CLEANUP_INTERVAL_SECONDS,
+            retry_base_seconds=config.TASK_RETRY_BASE_SECONDS,
+        )
+
+    def start(self) -> None:
+        if self.workers <= 0 or self._threads:
+            return
+        self._stopping.clear()
+        _running_pools.add(self)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"task-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        _running_pools.discard(self)
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._clean_up_when_due()
+                worked = self.run_once()
+            except Exception:  # pragma: no cover - keep the worker alive on DB outages
+                logger.exception("Task worker iteration failed")
+                worked = False
+            if not worked:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+
+    def run_once(self) -> bool:
+        """Claim and execute one ready task; returns ``False`` when none is ready."""
+        task_id = self._claim()
+        if task_id is None:
+            return False
+        self._execute(task_id)
+        return True
+
+    def _ready(self, now: datetime):
+        stale = now - timedelta(seconds=self.lease_seconds)
+        return or_(
+            and_(Task.status == PENDING, Task.run_after <= now),
+            and_(Task.status == RUNNING, Task.started_at < stale, Task.attempts < Task.max_attempts),
+        )
+
+    def _claim(self) -> Optional[int]:
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            candidates = db.scalars(
+                select(Task.id)
+                .where(self._ready(now))
+                .order_by(Task.run_after, Task.id)
+                .limit(max(self.workers, 1))
+            ).all()
+            for task_id in candidates:
+                claimed = db.execute(
+                    update(Task)
+                    .where(Task.id == task_id, self._ready(now))
+                    .values(status=RUNNING, started_at=now, attempts=Task.attempts + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                if claimed.rowcount == 1:
+                    db.commit()
+                    return task_id
+        return None
+
+    def _execute(self, task_id: int) -> None:
+        with self.session_factory() as db:
+            task = db.get(Task, task_id)
+            if task is None:
+                return
+            try:
+                handler = _handlers.get(task.name)
+                if handler is None:
+                    raise LookupError(f"No handler registered for task {task.name!r}")
+                handler(db, **task.payload)
+                task.status = DONE
+                task.finished_at = datetime.utcnow()
+                task.last_error = None
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                self._record_failure(db, task_id, exc)
+                return
+        with self._lock:
+            self.succeeded += 1
+
+    def _record_failure(self, db: Session, task_id: int, exc: Exception) -> None:
+        task = db.get(Task, task_id)
+        if task is None:
+            return
+        task.last_error = f"{type(exc).__name__}: {exc}"
+        if task.attempts >= task.max_attempts:
+            task.status = FAILED
+            task.finished_at = datetime.utcnow()
+            logger.error("Task %s (%s) failed permanently", task.id, task.name, exc_info=exc)
+        else:
+            task.status = PENDING
+            task.run_after = datetime.utcnow() + _retry_delay(self.retry_base_seconds, task.attempts)
+            logger.warning("Task %s (%s) failed, retrying", task.id, task.name, exc_info=exc)
+        db.commit()
+        with self._lock:
+            self.failed_attempts += 1
+
+    def _clean_up_when_due(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_cleanup:
+                return
+            self._next_cleanup = now + self.cleanup_interval_seconds
+        self.clean_up()
+
+    def clean_up(self, now: Optional[datetime] = None) -> tuple[int, int]:
+        """Fail expired leases on their last attempt and purge finished rows past retention.
+
+        Returns ``(failed, purged)`` row counts.
+        """
+        now = now or datetime.utcnow()
+        stale = now - timedelta(seconds=self.lease_seconds)
+        horizon = now - timedelta(days=self.retention_days)
+        with self.session_factory() as db:
+            failed = db.execute(
+                update(Task)
+                .where(Task.status == RUNNING, Task.started_at < stale, Task.attempts >= Task.max_attempts)
+                .values(status=FAILED, finished_at=now, last_error=LEASE_EXPIRED)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            # run_after never follows finished_at; bounding it keeps the delete on the status index.
+            purged = db.execute(
+                delete(Task)
+                .where(Task.status.in_((DONE, FAILED)), Task.run_after < horizon, Task.finished_at < horizon)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        if failed:
+            logger.error("%d task(s) failed permanently: %s", failed, LEASE_EXPIRED)
+        return failed, purged
+
+    def stats(self, db: Session) -> dict:
+        now = datetime.utcnow()
+        counts = {status: 0 for status in (PENDING, RUNNING, DONE, FAILED)}
+        counts.update(db.execute(select(Task.status, func.count()).group_by(Task.status)).all())
+        ready = and_(Task.status == PENDING, Task.run_after <= now)
+        depth, oldest = db.execute(select(func.count(), func.min(Task.run_after)).where(ready)).one()
+        return {
+            "workers": self.workers,
+            "workers_alive": sum(thread.is_alive() for thread in self._threads),
+            "tasks": counts,
+            "queue_depth": depth,
+            "lag_seconds": round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+            "succeeded": self.succeeded,
+            "failed_attempts": self.failed_attempts,
+        }
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session: Session) -> None:
+    if session.info.pop("tasks_enqueued", False):
+        for pool in list(_running_pools):
+            pool.wake()
@@ -0,0 +1,26 @@
+"""Pytest plugin for test suites: ``pytest_plugins = ["app.testing"]``."""
+import pytest
+
+from .query_budget import assert_max_queries, endpoint_budget
+
+
+class QueryBudgetFixture:
+    """``with query_budget(3): client.get("/jobs")`` fails the test past three statements.
+
+    ``query_budget.endpoint("GET", "/jobs")`` applies the budget registered in
+    ``ENDPOINT_BUDGETS`` for that route.
+    """
+
+    def __call__(self, max_queries: int, bind=None):
+        return assert_max_queries(max_queries, bind)
+
+    def endpoint(self, method: str, route: str, bind=None):
+        budget = endpoint_budget(method, route)
+        if budget is None:
+            raise KeyError(f"No query budget registered for {method} {route}")
+        return assert_max_queries(budget, bind)
+
+
+@pytest.fixture
+def query_budget() -> QueryBudgetFixture:
+    return QueryBudgetFixture()
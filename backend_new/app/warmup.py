@@ -0,0 +1,84 @@
+"""Startup work that moves first-request costs into the application lifespan.
+
+A fresh worker otherwise pays, on its first requests, for opening and
+configuring pool connections, configuring the ORM mappers and compiling the
+SQL of the hot endpoints. :func:`warm_up` does all of that before the worker
+accepts traffic. The statements below mirror the ones those endpoints issue
+(SQLAlchemy caches compiled SQL per engine by statement structure, so the
+parameter values do not matter) and match no rows.
+"""
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, configure_mappers
+
+from .config import Settings
+from .database import Database
+from .models import DRIVER_JOB_ORDER, Admin, CreditNote, Customer, Driver, Invoice, Job
+from .pagination import DEFAULT_PAGE_SIZE, PageParams, paginate
+
+logger = logging.getLogger(__name__)
+
+NO_MATCH = -1
+
+
+def _principal_lookups(db: Session) -> None:
+    for model in (Admin, Driver):
+        db.query(model).filter(model.email == "").first()
+
+
+def _identity_lookups(db: Session) -> None:
+    for model in (Job, Driver, Customer, Invoice, CreditNote):
+        db.get(model, NO_MATCH)
+
+
+def _job_list_first_page(db: Session) -> None:
+    params = PageParams(limit=DEFAULT_PAGE_SIZE, cursor=None, order="asc")
+    paginate(db.query(Job), params, sort="id", column=Job.id, id_column=Job.id)
+
+
+def _driver_job_list(db: Session) -> None:
+    versions = select(Job.id, Job.updated_at).where(Job.driver_id == NO_MATCH).order_by(*DRIVER_JOB_ORDER)
+    db.execute(versions).all()
+    db.query(Job).filter(Job.driver_id == NO_MATCH).order_by(*DRIVER_JOB_ORDER).all()
+
+
+HOT_QUERIES: tuple[Callable[[Session], None], ...] = (
+    _principal_lookups,
+    _identity_lookups,
+    _job_list_first_page,
+    _driver_job_list,
+)
+
+
+def precompile_hot_queries(database: Database) -> int:
+    """Run every hot query once on each engine; returns the number of engines warmed."""
+    warmed = 0
+    for engine in database.all_engines():
+        try:
+            with Session(bind=engine) as db:
+                for query in HOT_QUERIES:
+                    query(db)
+        except DBAPIError:
+            logger.warning("Skipping query warm-up for unreachable engine %s", engine.url)
+            continue
+        warmed += 1
+    return warmed
+
+
+def warm_up(database: Database, config: Settings) -> dict:
+    started = time.perf_counter()
+    configure_mappers()
+    connections = database.warm_up(config.DB_POOL_WARMUP)
+    engines = precompile_hot_queries(database) if config.PRECOMPILE_HOT_QUERIES else 0
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    logger.info(
+        "Warm-up opened %d connection(s) and compiled hot queries on %d engine(s) in %.1fms",
+        connections,
+        engines,
+        elapsed_ms,
+    )
+    return {"connections": connections, "engines": engines, "elapsed_ms": elapsed_ms}
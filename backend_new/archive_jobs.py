@@ -0,0 +1,37 @@
+"""Move old completed and cancelled jobs, with their invoices and credit notes, to the archive tables."""
+import argparse
+
+from app.archiving import archive_cutoff, archive_jobs
+from app.config import settings
+from app.database import SessionLocal
+
+
+def archive(days: int, batch_size: int) -> int:
+    cutoff = archive_cutoff(days)
+    session = SessionLocal()
+    try:
+        totals, _ = archive_jobs(session, cutoff, batch_size)
+    finally:
+        session.close()
+
+    print(
+        f"Archived {totals.jobs} job(s), {totals.invoices} invoice(s) and "
+        f"{totals.credit_notes} credit note(s) finished before {cutoff:%Y-%m-%d %H:%M}."
+    )
+    return totals.jobs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="archive jobs finished this long ago"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="jobs per transaction"
+    )
+    args = parser.parse_args()
+    archive(args.days, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
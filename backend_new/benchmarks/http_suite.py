@@ -0,0 +1,303 @@
+"""Drive the real application in-process and compare latency against stored baselines.
+
+Usage (from ``backend_new``)::
+
+    python -m benchmarks.http_suite                      # run and check against the baseline
+    python -m benchmarks.http_suite --update-baseline    # record new baseline numbers
+
+A dataset is generated into a temporary SQLite file (or ``--database``) with
+``generate_data``, then every scenario is run at each concurrency level through
+``httpx.ASGITransport``, so the full middleware, dependency and serialization
+stack is measured without socket noise. The run fails when a scenario's p95
+latency or throughput regresses past ``--tolerance`` relative to the baseline.
+Baselines are machine specific: record them on the machine that runs the check.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "http_suite.json"
+ADMIN_CREDENTIALS = {"username": "admin@example.com", "password": "admin123"}
+DRIVER_PASSWORD = "driver123"
+JOB_ACTIONS = ("acknowledge", "start", "complete")
+
+
+@dataclass
+class Context:
+    admin: dict
+    driver: dict
+    driver_email: str
+    driver_job_ids: list
+    job_ids: list
+
+
+@dataclass
+class Result:
+    scenario: str
+    concurrency: int
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario}@{self.concurrency}"
+
+
+Scenario = Callable[[httpx.AsyncClient, Context, int], Awaitable[httpx.Response]]
+
+
+async def admin_list_jobs(client, ctx, i):
+    return await client.get("/jobs", params={"limit": 50, "status": "completed"}, headers=ctx.admin)
+
+
+async def admin_read_job(client, ctx, i):
+    return await client.get(f"/jobs/{ctx.job_ids[i % len(ctx.job_ids)]}", headers=ctx.admin)
+
+
+async def admin_update_job(client, ctx, i):
+    job_id = ctx.job_ids[i % len(ctx.job_ids)]
+    body = {"description": f"benchmark update {i}"}
+    return await client.put(f"/jobs/{job_id}", json=body, headers=ctx.admin)
+
+
+async def driver_poll_jobs(client, ctx, i):
+    return await client.get("/drivers/me/jobs", headers=ctx.driver)
+
+
+async def driver_job_action(client, ctx, i):
+    job_id = ctx.driver_job_ids[i % len(ctx.driver_job_ids)]
+    return await client.post(f"/jobs/{job_id}/{JOB_ACTIONS[i % len(JOB_ACTIONS)]}", headers=ctx.driver)
+
+
+async def driver_login(client, ctx, i):
+    credentials = {"username": ctx.driver_email, "password": DRIVER_PASSWORD}
+    return await client.post("/drivers/login", data=credentials)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "admin_list_jobs": admin_list_jobs,
+    "admin_read_job": admin_read_job,
+    "admin_update_job": admin_update_job,
+    "driver_poll_jobs": driver_poll_jobs,
+    "driver_job_action": driver_job_action,
+    "driver_login": driver_login,
+}
+# bcrypt dominates logins, so they get a fraction of the request budget.
+REQUEST_SHARE = {"driver_login": 0.1}
+
+
+def _percentile(sorted_samples: list[float], fraction: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index] * 1000
+
+
+async def run_scenario(
+    client, ctx: Context, name: str, concurrency: int, requests: int, warmup: int
+) -> Result:
+    scenario = SCENARIOS[name]
+    for i in range(warmup):
+        await scenario(client, ctx, i)
+
+    samples: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await scenario(client, ctx, i)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return Result(
+        scenario=name,
+        concurrency=concurrency,
+        requests=len(samples),
+        errors=errors,
+        throughput=round(len(samples) / elapsed, 1),
+        p50_ms=round(statistics.median(samples) * 1000, 3),
+        p95_ms=round(_percentile(samples, 0.95), 3),
+        p99_ms=round(_percentile(samples, 0.99), 3),
+    )
+
+
+def _prepare_dataset(args) -> None:
+    from generate_data import GeneratorConfig, generate
+
+    config = GeneratorConfig(
+        drivers=args.drivers,
+        customers=args.customers,
+        jobs=args.jobs,
+        seed=args.seed,
+        anchor=date(2024, 1, 1),
+    )
+    generate(config, create_schema=True)
+
+
+async def _login_context(client) -> Context:
+    from sqlalchemy import func, select
+
+    from app.database import SessionLocal
+    from app.models import Driver, Job
+
+    response = await client.post("/token", data=ADMIN_CREDENTIALS)
+    response.raise_for_status()
+    admin = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    with SessionLocal() as db:
+        # The busiest active driver gives the polling scenario a realistic payload.
+        driver_id = db.scalar(
+            select(Job.driver_id)
+            .join(Driver, Driver.id == Job.driver_id)
+            .where(Driver.is_active.is_(True))
+            .group_by(Job.driver_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        email = db.scalar(select(Driver.email).where(Driver.id == driver_id))
+        driver_job_ids = list(db.scalars(select(Job.id).where(Job.driver_id == driver_id).limit(200)))
+        job_ids = list(db.scalars(select(Job.id).order_by(Job.id).limit(1000)))
+
+    response = await client.post("/drivers/login", data={"username": email, "password": DRIVER_PASSWORD})
+    response.raise_for_status()
+    driver = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return Context(admin, driver, email, driver_job_ids, job_ids)
+
+
+async def run_suite(args) -> list[Result]:
+    from app.main import create_app
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    # ASGITransport does not run the lifespan, which builds the app's services.
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            ctx = await _login_context(client)
+            for name in args.scenarios:
+                requests = max(args.concurrency[-1], int(args.requests * REQUEST_SHARE.get(name, 1.0)))
+                for concurrency in args.concurrency:
+                    result = await run_scenario(client, ctx, name, concurrency, requests, args.warmup)
+                    results.append(result)
+                    print(
+                        f"{result.key:<28} {result.throughput:>9.1f} req/s  p50 {result.p50_ms:>8.2f}ms  "
+                        f"p95 {result.p95_ms:>8.2f}ms  p99 {result.p99_ms:>8.2f}ms  errors {result.errors}"
+                    )
+    return results
+
+
+def compare(results: list[Result], baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of every result that regressed past ``tolerance``."""
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.key)
+        if expected is None:
+            continue
+        if result.p95_ms > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.key}: p95 {result.p95_ms:.2f}ms vs baseline {expected['p95_ms']:.2f}ms"
+            )
+        if result.throughput < expected["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.key}: {result.throughput:.1f} req/s vs baseline {expected['throughput']:.1f} req/s"
+            )
+        if result.errors > expected.get("errors", 0):
+            regressions.append(
+                f"{result.key}: {result.errors} errors vs baseline {expected.get('errors', 0)}"
+            )
+    return regressions
+
+
+def _csv_ints(value: str) -> list[int]:
+    return sorted(int(item) for item in value.split(","))
+
+
+def _scenario_names(value: str) -> list[str]:
+    names = list(SCENARIOS) if value == "all" else value.split(",")
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return names
+
+
+def parse_args(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database", help="SQLite file to use; generated into a temp dir when omitted")
+    parser.add_argument("--reuse", action="store_true", help="skip data generation and use --database as is")
+    parser.add_argument("--drivers", type=int, default=100)
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", type=_scenario_names, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=_csv_ints, default=[1, 8, 32])
+    parser.add_argument(
+        "--requests", type=int, default=400, help="requests per scenario and concurrency level"
+    )
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = parse_args(argv)
+    if args.reuse and not args.database:
+        raise SystemExit("--reuse needs --database")
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+    from app.config import Settings
+    from app.database import configure
+
+    configure(Settings(DATABASE_URL=f"sqlite:///{database}"))
+
+    if not args.reuse:
+        _prepare_dataset(args)
+    results = asyncio.run(run_suite(args))
+
+    current = {result.key: asdict(result) for result in results}
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s)." if regressions else "No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Compare the standard and fast list serialization paths.
+
+Usage (from ``backend_new``)::
+
+    python -m benchmarks.list_serialization --rows 100000
+
+Both paths read the same rows from an in-memory SQLite database. The standard
+path mirrors FastAPI's handling of ``Page[JobRead]``: ORM entities, pydantic
+validation with ``from_attributes`` and a JSON dump. The fast path selects the
+read columns as tuples and encodes them directly.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.fastpath import dumps, list_query, read_fields
+from app.models import Base, Customer, Job, JobStatus
+from app.schemas.job import JobRead
+from app.schemas.pagination import Page
+
+
+def build_database(rows: int) -> Session:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    statuses = list(JobStatus)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(Customer), [{"name": "Bench", "email": "bench@example.com"}])
+        connection.execute(
+            insert(Job),
+            [
+                {
+                    "title": f"Job {index}",
+                    "description": "Benchmark delivery",
+                    "status": statuses[index % len(statuses)],
+                    "scheduled_at": start + timedelta(minutes=index),
+                    "customer_id": 1,
+                    "updated_at": start,
+                }
+                for index in range(rows)
+            ],
+        )
+    return Session(engine)
+
+
+def standard_path(db: Session) -> bytes:
+    adapter = TypeAdapter(Page[JobRead])
+    page = adapter.validate_python({"items": db.query(Job).all(), "next_cursor": None}, from_attributes=True)
+    return json.dumps(adapter.dump_python(page, mode="json")).encode()
+
+
+def fast_path(db: Session) -> bytes:
+    fields = read_fields(JobRead)
+    rows = list_query(db, Job, JobRead, fast=True).all()
+    return dumps({"items": [dict(zip(fields, row)) for row in rows], "next_cursor": None})
+
+
+def best_of(func, db: Session, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        func(db)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list serialization paths")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db = build_database(args.rows)
+    assert json.loads(standard_path(db)) == json.loads(fast_path(db))
+
+    standard = best_of(standard_path, db, args.repeat)
+    fast = best_of(fast_path, db, args.repeat)
+    print(f"rows:     {args.rows}")
+    print(f"standard: {standard * 1000:8.1f} ms")
+    print(f"fast:     {fast * 1000:8.1f} ms")
+    print(f"speedup:  {standard / fast:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Measure worker cold-start cost: import, lifespan startup and first-request latency.
+
+Usage (from ``backend_new``)::
+
+    python -m benchmarks.startup                      # run and check against the baseline
+    python -m benchmarks.startup --update-baseline    # record new baseline numbers
+
+Every sample is a fresh interpreter, like a worker started during scale-out.
+It times ``import app.main``, the lifespan startup (engine creation, pool
+warm-up and hot query compilation), the first authenticated ``GET /jobs`` and
+a second one for reference. Samples run with the default settings and again
+with the warm-up disabled, so the trade between startup and first request
+stays visible. Medians are compared against the stored baseline; baselines
+are machine specific.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "startup.json"
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+ADMIN_EMAIL = "admin@example.com"
+FIRST_REQUEST = ("/jobs", {"limit": 50})
+
+VARIANTS = {
+    "default": {},
+    "no_warmup": {"DB_POOL_WARMUP": "0", "PRECOMPILE_HOT_QUERIES": "false"},
+}
+METRICS = ("import_ms", "startup_ms", "first_request_ms", "second_request_ms", "cold_start_ms")
+
+
+def measure_once() -> dict:
+    """Run in a fresh interpreter; the app reads the database from ``DATABASE_URL``."""
+    import asyncio
+
+    import httpx
+
+    started = time.perf_counter()
+    from app.main import app
+
+    imported = time.perf_counter()
+
+    from app.dependencies import Role
+    from app.security import create_access_token
+
+    token = create_access_token(ADMIN_EMAIL, Role.ADMIN, config=app.state.settings)
+    headers = {"Authorization": f"Bearer {token}"}
+    path, params = FIRST_REQUEST
+
+    async def run() -> dict:
+        lifespan_started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                timings = []
+                for _ in range(2):
+                    request_started = time.perf_counter()
+                    response = await client.get(path, params=params, headers=headers)
+                    response.raise_for_status()
+                    timings.append(time.perf_counter() - request_started)
+        return {
+            "import_ms": (imported - started) * 1000,
+            "startup_ms": (ready - lifespan_started) * 1000,
+            "first_request_ms": timings[0] * 1000,
+            "second_request_ms": timings[1] * 1000,
+        }
+
+    result = asyncio.run(run())
+    result["cold_start_ms"] = result["import_ms"] + result["startup_ms"] + result["first_request_ms"]
+    return result
+
+
+def _prepare_dataset(database: str) -> None:
+    from app.config import Settings
+    from app.database import configure
+
+    configure(Settings(DATABASE_URL=f"sqlite:///{database}"))
+    from generate_data import GeneratorConfig, generate
+
+    generate(
+        GeneratorConfig(drivers=20, customers=200, jobs=5000, anchor=date(2024, 1, 1)),
+        create_schema=True,
+    )
+
+
+def _sample(database: str, overrides: dict) -> dict:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", **overrides)
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--measure-once"],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_variants(database: str, runs: int) -> dict[str, dict]:
+    results = {}
+    for name, overrides in VARIANTS.items():
+        samples = [_sample(database, overrides) for _ in range(runs)]
+        results[name] = {
+            metric: round(statistics.median(sample[metric] for sample in samples), 3) for metric in METRICS
+        }
+        print(
+            f"{name:<10} import {results[name]['import_ms']:>8.1f}ms  "
+            f"startup {results[name]['startup_ms']:>7.1f}ms  "
+            f"first {results[name]['first_request_ms']:>7.1f}ms  "
+            f"second {results[name]['second_request_ms']:>6.1f}ms  "
+            f"cold start {results[name]['cold_start_ms']:>8.1f}ms"
+        )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of every median that regressed past ``tolerance``."""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(name, {}).get(metric)
+            if expected is not None and value > expected * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {value:.1f}ms vs baseline {expected:.1f}ms")
+    return regressions
+
+
+def parse_args(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per variant")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--measure-once", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = parse_args(argv)
+    sys.path.insert(0, str(BACKEND_DIR))
+    if args.measure_once:
+        print(json.dumps(measure_once()))
+        return 0
+
+    database = os.path.join(tempfile.mkdtemp(prefix="bench-startup-"), "startup.db")
+    _prepare_dataset(database)
+    results = run_variants(database, args.runs)
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s)." if regressions else "No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Fail if any hot query falls back to a full table scan or a sort on SQLite.
+
+Runs ``EXPLAIN QUERY PLAN`` for the statements behind the busiest endpoints
+against a schema built from the models (or an existing database passed with
+``--url``) and exits non-zero when a plan contains ``SCAN <table>`` or has to
+sort rows with a temporary B-tree. List endpoints are checked with the exact
+SQL that :func:`app.pagination.paginate` emits, for every sort field in both
+directions and for the indexed filters, on a first page and after a cursor.
+An unfiltered page may walk the table or an index in order, since ``LIMIT``
+stops it after one page; it must not sort.
+"""
+import argparse
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.models import DRIVER_JOB_ORDER, Base, CreditNote, Customer, Driver, Invoice, Job, JobStatus
+from app.pagination import PageParams, encode_cursor, paginate
+from app.routers.credit_notes import CREDIT_NOTE_SORT_FIELDS
+from app.routers.customers import CUSTOMER_SORT_FIELDS
+from app.routers.drivers import DRIVER_SORT_FIELDS
+from app.routers.invoices import INVOICE_SORT_FIELDS
+from app.routers.jobs import JOB_SORT_FIELDS
+
+FULL_SCAN = re.compile(r"\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY)")
+
+SAMPLE_VALUES = {"id": 1, "amount": 10.0, "name": "m", "full_name": "m", "email": "m@example.com"}
+
+LISTS = (
+    (Job, JOB_SORT_FIELDS, {"status": [Job.status == JobStatus.COMPLETED]}),
+    (Invoice, INVOICE_SORT_FIELDS, {}),
+    (CreditNote, CREDIT_NOTE_SORT_FIELDS, {}),
+    (Customer, CUSTOMER_SORT_FIELDS, {}),
+    (Driver, DRIVER_SORT_FIELDS, {}),
+)
+
+
+def hot_queries() -> dict:
+    return {
+        "driver jobs": select(Job).where(Job.driver_id == 1).order_by(*DRIVER_JOB_ORDER),
+        "driver job versions": select(Job.id, Job.updated_at)
+        .where(Job.driver_id == 1)
+        .order_by(*DRIVER_JOB_ORDER),
+        "jobs by status": select(Job).where(Job.status == JobStatus.PENDING).order_by(Job.scheduled_at),
+        "jobs by customer": select(Job).where(Job.customer_id == 1).order_by(Job.id),
+        "invoices by customer": select(Invoice)
+        .where(Invoice.customer_id == 1)
+        .order_by(Invoice.issued_at),
+        "credit notes by customer": select(CreditNote)
+        .where(CreditNote.customer_id == 1)
+        .order_by(CreditNote.created_at),
+        "credit notes by job": select(CreditNote).where(CreditNote.job_id == 1),
+        "driver auth lookup": select(Driver).where(Driver.email == "driver@example.com"),
+    }
+
+
+def _list_cases():
+    for model, sort_fields, filters in LISTS:
+        for sort in sort_fields:
+            for label, criteria in {"": [], **filters}.items():
+                if label and sort not in ("id", "scheduled_at"):
+                    continue
+                for order in ("asc", "desc"):
+                    name = f"{model.__tablename__} sort={sort} {order}" + (f" {label}=" if label else "")
+                    yield name, model, sort, criteria, order
+
+
+def paginate_statements(engine) -> dict:
+    """``{case: (sql, parameters, unfiltered)}`` for what ``paginate`` issues in each list case."""
+    statements: dict[str, tuple] = {}
+    captured: list = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            for name, model, sort, criteria, order in _list_cases():
+                column = getattr(model, sort)
+                value = SAMPLE_VALUES.get(sort, datetime(2024, 1, 1))
+                for page, cursor in (("first page", None), ("after cursor", encode_cursor(sort, value, 1))):
+                    captured.clear()
+                    params = PageParams(limit=50, cursor=cursor, order=order)
+                    query = db.query(model).filter(*criteria)
+                    paginate(query, params, sort=sort, column=column, id_column=model.id)
+                    for index, (sql, parameters) in enumerate(captured, 1):
+                        statements[f"{name} {page} #{index}"] = (sql, parameters, not criteria)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def explain(connection, statement) -> list[str]:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def explain_sql(connection, sql: str, parameters) -> list[str]:
+    return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+
+
+def check(url: str) -> int:
+    engine = create_engine(url)
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        Base.metadata.create_all(engine)
+
+    plans = {}
+    with engine.connect() as connection:
+        for name, statement in hot_queries().items():
+            plans[name] = (explain(connection, statement), False)
+    list_statements = paginate_statements(engine)
+    with engine.connect() as connection:
+        for name, (sql, parameters, unfiltered) in list_statements.items():
+            plans[name] = (explain_sql(connection, sql, parameters), unfiltered)
+
+    failures = 0
+    for name, (plan, ordered_walk) in plans.items():
+        bad = [
+            line
+            for line in plan
+            if TEMP_SORT.search(line) or (FULL_SCAN.search(line) and not ordered_walk)
+        ]
+        print(f"{'FAIL' if bad else 'ok  '} {name}: {' | '.join(plan)}")
+        failures += bool(bad)
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite://", help="SQLite URL (default: in-memory schema)")
+    args = parser.parse_args()
+    sys.exit(1 if check(args.url) else 0)
+
+
+if __name__ == "__main__":
+    main()
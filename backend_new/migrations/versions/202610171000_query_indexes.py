@@ -0,0 +1,28 @@
+"""composite indexes for hot query paths"""
+
+from alembic import op
+
+revision = "202610171000"
+down_revision = "202403031200"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_jobs_driver_id_scheduled_at", "jobs", ["driver_id", "scheduled_at"])
+    op.create_index("ix_jobs_status_scheduled_at", "jobs", ["status", "scheduled_at"])
+    op.create_index("ix_jobs_customer_id", "jobs", ["customer_id"])
+    op.create_index("ix_invoices_customer_id_issued_at", "invoices", ["customer_id", "issued_at"])
+    op.create_index(
+        "ix_credit_notes_customer_id_created_at", "credit_notes", ["customer_id", "created_at"]
+    )
+    op.create_index("ix_credit_notes_job_id", "credit_notes", ["job_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_credit_notes_job_id", table_name="credit_notes")
+    op.drop_index("ix_credit_notes_customer_id_created_at", table_name="credit_notes")
+    op.drop_index("ix_invoices_customer_id_issued_at", table_name="invoices")
+    op.drop_index("ix_jobs_customer_id", table_name="jobs")
+    op.drop_index("ix_jobs_status_scheduled_at", table_name="jobs")
+    op.drop_index("ix_jobs_driver_id_scheduled_at", table_name="jobs")
@@ -0,0 +1,26 @@
+"""dashboard rollup counters
+
+Run ``python rebuild_rollups.py`` after upgrading to backfill the counters
+from existing jobs, invoices and credit notes.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "202610171100"
+down_revision = "202610171000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dashboard_counters",
+        sa.Column("metric", sa.String(), primary_key=True),
+        sa.Column("dimension", sa.String(), primary_key=True),
+        sa.Column("value", sa.Float(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_counters")
@@ -0,0 +1,85 @@
+"""full-text search index over jobs and customers"""
+
+from alembic import op
+
+revision = "202610171400"
+down_revision = "202610171300"
+branch_labels = None
+depends_on = None
+
+
+JOB_ROW = "new.id * 2, new.title, coalesce(new.description, '')"
+CUSTOMER_ROW = "new.id * 2 + 1, new.name, coalesce(new.email, '') || ' ' || coalesce(new.address, '')"
+JOB_DOCUMENT = "coalesce(title, '') || ' ' || coalesce(description, '')"
+CUSTOMER_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(address, '')"
+TRIGGERS = (
+    "jobs_search_insert",
+    "jobs_search_update",
+    "jobs_search_delete",
+    "customers_search_insert",
+    "customers_search_update",
+    "customers_search_delete",
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(f"CREATE INDEX ix_jobs_search ON jobs USING gin (to_tsvector('english', {JOB_DOCUMENT}))")
+        op.execute(
+            "CREATE INDEX ix_customers_search ON customers "
+            f"USING gin (to_tsvector('english', {CUSTOMER_DOCUMENT}))"
+        )
+        return
+    if dialect != "sqlite":
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE search_index USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute("INSERT INTO search_index(search_index, rank) VALUES ('rank', 'bm25(2.0, 1.0)')")
+    op.execute(
+        "INSERT INTO search_index(rowid, title, body) "
+        "SELECT id * 2, title, coalesce(description, '') FROM jobs"
+    )
+    op.execute(
+        "INSERT INTO search_index(rowid, title, body) "
+        "SELECT id * 2 + 1, name, coalesce(email, '') || ' ' || coalesce(address, '') FROM customers"
+    )
+    op.execute(
+        "CREATE TRIGGER jobs_search_insert AFTER INSERT ON jobs BEGIN "
+        f"INSERT INTO search_index(rowid, title, body) VALUES ({JOB_ROW}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER jobs_search_update AFTER UPDATE OF title, description ON jobs BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2; "
+        f"INSERT INTO search_index(rowid, title, body) VALUES ({JOB_ROW}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER jobs_search_delete AFTER DELETE ON jobs BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2; END"
+    )
+    op.execute(
+        "CREATE TRIGGER customers_search_insert AFTER INSERT ON customers BEGIN "
+        f"INSERT INTO search_index(rowid, title, body) VALUES ({CUSTOMER_ROW}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER customers_search_update AFTER UPDATE OF name, email, address ON customers BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2 + 1; "
+        f"INSERT INTO search_index(rowid, title, body) VALUES ({CUSTOMER_ROW}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER customers_search_delete AFTER DELETE ON customers BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2 + 1; END"
+    )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_customers_search")
+        op.execute("DROP INDEX IF EXISTS ix_jobs_search")
+    elif dialect == "sqlite":
+        for trigger in TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS search_index")
@@ -0,0 +1,86 @@
+"""archive tables for finished jobs, invoices and credit notes"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "202610171500"
+down_revision = "202610171400"
+branch_labels = None
+depends_on = None
+
+
+# The type already exists on PostgreSQL since the initial migration.
+job_status = postgresql.ENUM(
+    "pending",
+    "assigned",
+    "in_progress",
+    "completed",
+    "cancelled",
+    name="jobstatus",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("status", job_status, nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("driver_id", sa.Integer(), nullable=True),
+        sa.Column("customer_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_jobs_archive_customer_id", "jobs_archive", ["customer_id"])
+    op.create_index(
+        "ix_jobs_archive_driver_id_scheduled_at", "jobs_archive", ["driver_id", "scheduled_at"]
+    )
+    op.create_table(
+        "invoices_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("customer_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("issued_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_invoices_archive_customer_id_issued_at", "invoices_archive", ["customer_id", "issued_at"]
+    )
+    op.create_index("ix_invoices_archive_job_id", "invoices_archive", ["job_id"])
+    op.create_table(
+        "credit_notes_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("customer_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_credit_notes_archive_customer_id_created_at",
+        "credit_notes_archive",
+        ["customer_id", "created_at"],
+    )
+    op.create_index("ix_credit_notes_archive_job_id", "credit_notes_archive", ["job_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_credit_notes_archive_job_id", table_name="credit_notes_archive")
+    op.drop_index("ix_credit_notes_archive_customer_id_created_at", table_name="credit_notes_archive")
+    op.drop_table("credit_notes_archive")
+    op.drop_index("ix_invoices_archive_job_id", table_name="invoices_archive")
+    op.drop_index("ix_invoices_archive_customer_id_issued_at", table_name="invoices_archive")
+    op.drop_table("invoices_archive")
+    op.drop_index("ix_jobs_archive_driver_id_scheduled_at", table_name="jobs_archive")
+    op.drop_index("ix_jobs_archive_customer_id", table_name="jobs_archive")
+    op.drop_table("jobs_archive")
@@ -0,0 +1,30 @@
+"""indexes ending in id for keyset list orderings"""
+
+from alembic import op
+
+revision = "202610171600"
+down_revision = "202610171500"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_jobs_status_id", "jobs", ["status", "id"]),
+    ("ix_jobs_scheduled_at_id", "jobs", ["scheduled_at", "id"]),
+    ("ix_jobs_completed_at_id", "jobs", ["completed_at", "id"]),
+    ("ix_invoices_issued_at_id", "invoices", ["issued_at", "id"]),
+    ("ix_invoices_amount_id", "invoices", ["amount", "id"]),
+    ("ix_credit_notes_created_at_id", "credit_notes", ["created_at", "id"]),
+    ("ix_credit_notes_amount_id", "credit_notes", ["amount", "id"]),
+    ("ix_customers_name_id", "customers", ["name", "id"]),
+    ("ix_drivers_full_name_id", "drivers", ["full_name", "id"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,21 @@
+"""index matching the driver job list ordering"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "202610171700"
+down_revision = "202610171600"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_jobs_driver_id_schedule_order",
+        "jobs",
+        ["driver_id", sa.text("(scheduled_at IS NULL)"), "scheduled_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_driver_id_schedule_order", table_name="jobs")
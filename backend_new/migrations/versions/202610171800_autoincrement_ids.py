@@ -0,0 +1,66 @@
+"""never reuse job, invoice and credit note ids on SQLite
+
+Archived rows keep their ids, but SQLite hands out max(id) + 1 for a plain
+rowid table, so deleting the newest hot row would let a new row take an id
+that is already archived. AUTOINCREMENT needs a table rebuild on SQLite; its
+sequence starts past the highest hot or archived id. Other databases use
+sequences that never go back and are left alone.
+"""
+
+import warnings
+
+from alembic import op
+from sqlalchemy.exc import SAWarning
+
+revision = "202610171800"
+down_revision = "202610171700"
+branch_labels = None
+depends_on = None
+
+
+TABLES = (
+    ("jobs", "jobs_archive"),
+    ("invoices", "invoices_archive"),
+    ("credit_notes", "credit_notes_archive"),
+)
+
+
+def _rebuild(table: str, autoincrement: bool) -> None:
+    bind = op.get_bind()
+    # Batch mode drops triggers and cannot reflect expression indexes; put them back afterwards.
+    extras = bind.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+        "AND sql IS NOT NULL",
+        (table,),
+    ).all()
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", "Skipped unsupported reflection of expression-based", SAWarning)
+        with op.batch_alter_table(
+            table, recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}
+        ):
+            pass
+    existing = set(
+        bind.exec_driver_sql("SELECT name FROM sqlite_master WHERE tbl_name = ?", (table,)).scalars()
+    )
+    for name, sql in extras:
+        if name not in existing:
+            op.execute(sql)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table, archive in TABLES:
+        _rebuild(table, autoincrement=True)
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table}', "
+            f"max((SELECT coalesce(max(id), 0) FROM {table}), (SELECT coalesce(max(id), 0) FROM {archive}))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table, _ in TABLES:
+        _rebuild(table, autoincrement=False)
@@ -0,0 +1,35 @@
+"""Recompute dashboard counters from the source tables and report any drift."""
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.rollups import rebuild_counters
+
+
+def rebuild(check_only: bool = False) -> int:
+    session = SessionLocal()
+    try:
+        drift = rebuild_counters(session)
+        if check_only:
+            session.rollback()
+        else:
+            session.commit()
+    finally:
+        session.close()
+
+    for (metric, dimension), (stored, actual) in sorted(drift.items()):
+        print(f"{metric}[{dimension}]: stored={stored:g} actual={actual:g}")
+    print(f"{len(drift)} counter(s) drifted." if drift else "Counters match source tables.")
+    return len(drift)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true", help="report drift without rewriting counters")
+    args = parser.parse_args()
+    drifted = rebuild(check_only=args.check)
+    sys.exit(1 if args.check and drifted else 0)
+
+
+if __name__ == "__main__":
+    main()
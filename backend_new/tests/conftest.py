@@ -0,0 +1,60 @@
+"""Fixtures for the API tests: the application on a throwaway SQLite database."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.database import SessionLocal, database
+from app.main import create_app
+from app.models import Admin, Base, Customer, Driver
+from app.security import get_password_hash
+
+pytest_plugins = ["app.testing"]
+
+ADMIN_EMAIL = "admin@example.com"
+DRIVER_EMAIL = "driver@example.com"
+CUSTOMER_EMAIL = "customer@example.com"
+PASSWORD = "secret"
+
+
+@pytest.fixture(scope="session")
+def settings(tmp_path_factory) -> Settings:
+    path = tmp_path_factory.mktemp("db") / "test.db"
+    return Settings(DATABASE_URL=f"sqlite:///{path}", PASSWORD_HASH_WORKERS=0, TASK_WORKERS=0)
+
+
+@pytest.fixture(scope="session")
+def client(settings):
+    app = create_app(settings)
+    Base.metadata.create_all(database.engine)
+    with SessionLocal() as db:
+        db.add(Admin(email=ADMIN_EMAIL, full_name="Admin", hashed_password=get_password_hash(PASSWORD)))
+        db.add(Driver(email=DRIVER_EMAIL, full_name="Driver", hashed_password=get_password_hash(PASSWORD)))
+        db.add(Customer(name="Customer", email=CUSTOMER_EMAIL))
+        db.commit()
+    with TestClient(app) as client:
+        yield client
+
+
+def _login(client, path: str, email: str) -> dict:
+    response = client.post(path, data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client) -> dict:
+    return _login(client, "/token", ADMIN_EMAIL)
+
+
+@pytest.fixture(scope="session")
+def driver_headers(client) -> dict:
+    return _login(client, "/drivers/login", DRIVER_EMAIL)
+
+
+@pytest.fixture(scope="session")
+def ids(client):
+    """Ids of the seeded driver and customer."""
+    with SessionLocal() as db:
+        driver = db.query(Driver).filter(Driver.email == DRIVER_EMAIL).one()
+        customer = db.query(Customer).filter(Customer.email == CUSTOMER_EMAIL).one()
+        return {"driver": driver.id, "customer": customer.id}
@@ -0,0 +1,89 @@
+import subprocess
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.database import SessionLocal, configure, database
+from app.main import create_app
+from app.models import Admin, Base
+from app.security import get_password_hash
+
+from .conftest import ADMIN_EMAIL, PASSWORD
+
+
+@contextmanager
+def app_client(settings: Settings, tmp_path, **overrides):
+    """A client for an application built from its own settings and database.
+
+    ``settings``, the shared test configuration, is restored afterwards.
+    """
+    config = Settings(
+        DATABASE_URL=f"sqlite:///{tmp_path / 'override.db'}",
+        PASSWORD_HASH_WORKERS=0,
+        TASK_WORKERS=0,
+        **overrides,
+    )
+    app = create_app(config)
+    Base.metadata.create_all(database.engine)
+    with SessionLocal() as db:
+        db.add(Admin(email=ADMIN_EMAIL, full_name="Admin", hashed_password=get_password_hash(PASSWORD)))
+        db.commit()
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        configure(settings)
+
+
+@pytest.fixture
+def overridden(settings, tmp_path):
+    with app_client(
+        settings,
+        tmp_path,
+        ACCESS_TOKEN_EXPIRE_MINUTES=5,
+        PRINCIPAL_CACHE_SIZE=10,
+        PRINCIPAL_CACHE_TTL_SECONDS=1.5,
+        DRIVER_EVENT_QUEUE_SIZE=7,
+        TASK_RETRY_BASE_SECONDS=0.5,
+    ) as client:
+        yield client
+
+
+def test_create_app_settings_reach_services(overridden):
+    state = overridden.app.state
+    assert state.settings.DATABASE_URL.endswith("override.db")
+    assert state.event_hub.queue_size == 7
+    assert state.password_hasher.workers == 0
+    assert state.task_workers.workers == 0
+    assert state.task_workers.retry_base_seconds == 0.5
+
+    response = overridden.post("/token", data={"username": ADMIN_EMAIL, "password": PASSWORD})
+    expires_at = datetime.fromisoformat(response.json()["expires_at"])
+    assert expires_at - datetime.utcnow() < timedelta(minutes=6)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    cache = overridden.get("/admin/cache", headers=headers).json()["principals"]
+    assert (cache["maxsize"], cache["ttl_seconds"]) == (10, 1.5)
+    tasks = overridden.get("/admin/tasks", headers=headers).json()
+    assert (tasks["workers"], tasks["workers_alive"]) == (0, 0)
+
+
+def test_tokens_are_signed_with_the_app_secret(settings, admin_headers, tmp_path):
+    # The same admin exists in both databases; only the signing key differs.
+    with app_client(settings, tmp_path, SECRET_KEY="another-secret") as client:
+        response = client.get("/admin/cache", headers=admin_headers)
+        assert (response.status_code, response.json()["detail"]) == (401, "Invalid token")
+
+
+def test_importing_main_builds_nothing():
+    code = (
+        "import sys, app.main; "
+        "assert 'app' not in vars(app.main); "
+        "assert not [name for name in sys.modules if name.startswith('app.routers')]"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parents[1], check=True)
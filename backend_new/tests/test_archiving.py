@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app import archiving
+from app.archiving import archive_batch, archive_cutoff, archive_jobs
+from app.database import SessionLocal
+from app.models import CreditNote, Invoice, Job, JobStatus
+
+
+def _add_job(db, customer_id: int, status: JobStatus, finished: datetime, amount: float, credit: float):
+    job = Job(title="Job", customer_id=customer_id, status=status, completed_at=finished, updated_at=finished)
+    db.add(job)
+    db.flush()
+    db.add(Invoice(job_id=job.id, customer_id=customer_id, amount=amount, issued_at=finished))
+    db.add(CreditNote(job_id=job.id, customer_id=customer_id, amount=credit, created_at=finished))
+    return job
+
+
+def _balances(client, headers, customer_id: int) -> tuple:
+    balances = client.get("/customers/balances", params={"limit": 200}, headers=headers).json()["items"]
+    balance = next(item for item in balances if item["customer_id"] == customer_id)
+    ledger = client.get(f"/customers/{customer_id}/ledger", params={"limit": 200}, headers=headers).json()
+    entries = sorted((entry["entry_type"], entry["amount"]) for entry in ledger["items"])
+    totals = (ledger["invoiced_total"], ledger["credited_total"], ledger["balance"])
+    return balance, totals, entries
+
+
+def test_archiving_keeps_customer_balances(client, admin_headers):
+    response = client.post(
+        "/customers", json={"name": "Archived", "email": "archived@example.com"}, headers=admin_headers
+    )
+    customer_id = response.json()["id"]
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    with SessionLocal() as db:
+        old_jobs = [_add_job(db, customer_id, JobStatus.COMPLETED, long_ago, 100.0, 10.0) for _ in range(3)]
+        _add_job(db, customer_id, JobStatus.COMPLETED, datetime.utcnow(), 50.0, 5.0)
+        db.commit()
+        old_ids = [job.id for job in old_jobs]
+
+    before = _balances(client, admin_headers, customer_id)
+    assert before[0]["invoiced_total"] == 350.0
+    assert before[0]["credited_total"] == 35.0
+    assert before[1] == (350.0, 35.0, 315.0)
+    assert len(before[2]) == 8
+
+    with SessionLocal() as db:
+        totals, remaining = archive_jobs(db, archive_cutoff(90), batch_size=2)
+        assert totals.jobs >= 3 and not remaining
+        assert not db.scalars(select(Invoice.id).where(Invoice.job_id.in_(old_ids))).all()
+
+    assert _balances(client, admin_headers, customer_id) == before
+
+
+def test_archived_ids_are_not_reused(client, admin_headers, ids):
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    with SessionLocal() as db:
+        newest = _add_job(db, ids["customer"], JobStatus.CANCELLED, long_ago, 20.0, 2.0)
+        db.commit()
+        archived_id = newest.id
+        archive_jobs(db, archive_cutoff(90), batch_size=100)
+        assert db.get(Job, archived_id) is None
+
+    payload = {"title": "Next", "customer_id": ids["customer"]}
+    response = client.post("/jobs", json=payload, headers=admin_headers)
+    assert response.json()["id"] > archived_id
+    listed = client.get(
+        "/jobs", params={"include_archived": True, "limit": 200}, headers=admin_headers
+    ).json()["items"]
+    listed_ids = [job["id"] for job in listed]
+    assert len(listed_ids) == len(set(listed_ids))
+
+
+def test_batch_skips_jobs_reopened_after_selection(ids, monkeypatch):
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    with SessionLocal() as db:
+        job = _add_job(db, ids["customer"], JobStatus.PENDING, long_ago, 30.0, 3.0)
+        db.commit()
+        job_id = job.id
+        # The candidate select saw the job while it was still completed.
+        monkeypatch.setattr(
+            archiving, "archivable_jobs", lambda cutoff, after_id=0: select(Job.id).where(Job.id == job_id)
+        )
+        batch = archive_batch(db, archive_cutoff(90), batch_size=10)
+        db.commit()
+        assert (batch.jobs, batch.invoices, batch.credit_notes, batch.last_job_id) == (0, 0, 0, job_id)
+        assert db.get(Job, job_id) is not None
+        assert db.scalar(select(Invoice.id).where(Invoice.job_id == job_id)) is not None
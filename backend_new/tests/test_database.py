@@ -0,0 +1,13 @@
+import importlib.util
+
+import pytest
+
+from app.config import Settings
+from app.database import Database
+
+
+@pytest.mark.skipif(importlib.util.find_spec("asyncpg") is not None, reason="asyncpg is installed")
+def test_async_mode_without_its_driver_fails_clearly():
+    database = Database(Settings(DATABASE_URL="postgresql://app@localhost/app", ASYNC_DATABASE=True))
+    with pytest.raises(RuntimeError, match="ASYNC_DATABASE needs the 'asyncpg' driver"):
+        database.async_engine
@@ -0,0 +1,18 @@
+def _login(client, email: str, password: str) -> int:
+    return client.post("/drivers/login", data={"username": email, "password": password}).status_code
+
+
+def test_created_and_updated_passwords_log_in(client, admin_headers):
+    email = "new-driver@example.com"
+    payload = {"email": email, "full_name": "New Driver", "password": "first"}
+    created = client.post("/drivers", json=payload, headers=admin_headers)
+    assert created.status_code == 201
+    assert client.post("/drivers", json=payload, headers=admin_headers).status_code == 400
+    assert _login(client, email, "first") == 200
+
+    driver_id = created.json()["id"]
+    updated = client.put(f"/drivers/{driver_id}", json={"password": "second"}, headers=admin_headers)
+    assert updated.status_code == 200
+    assert (_login(client, email, "first"), _login(client, email, "second")) == (401, 200)
+
+    assert client.put("/drivers/999999", json={"password": "x"}, headers=admin_headers).status_code == 404
@@ -0,0 +1,44 @@
+import pytest
+
+from app.events import JOB_ASSIGNED, JOB_CANCELLED, JOB_UPDATED
+
+
+@pytest.fixture
+def published(client, monkeypatch):
+    events = []
+    event_hub = client.app.state.event_hub
+    monkeypatch.setattr(event_hub, "is_subscribed", lambda driver_id: True)
+    monkeypatch.setattr(
+        event_hub, "publish", lambda driver_id, event, data: events.append((driver_id, event, data["id"]))
+    )
+    return events
+
+
+def test_bulk_writes_notify_drivers(client, admin_headers, ids, published):
+    driver_id = ids["driver"]
+    other = client.post(
+        "/drivers",
+        json={"email": "other-driver@example.com", "full_name": "Other", "password": "secret"},
+        headers=admin_headers,
+    ).json()["id"]
+    jobs = [
+        {"title": "Assigned", "customer_id": ids["customer"], "driver_id": driver_id},
+        {"title": "Open", "customer_id": ids["customer"]},
+    ]
+    created = client.post("/jobs/bulk", json=jobs, headers=admin_headers).json()["results"]
+    assigned, unassigned = (item["id"] for item in created)
+    assert published == [(driver_id, JOB_ASSIGNED, assigned)]
+
+    published.clear()
+    patches = [
+        {"id": assigned, "driver_id": other},
+        {"id": unassigned, "title": "Still open"},
+        {"id": 10**9, "title": "Missing"},
+    ]
+    client.patch("/jobs/bulk", json=patches, headers=admin_headers)
+    expected = [(other, JOB_ASSIGNED, assigned), (driver_id, JOB_CANCELLED, assigned)]
+    assert sorted(published) == sorted(expected)
+
+    published.clear()
+    client.patch("/jobs/bulk", json=[{"id": assigned, "title": "Renamed"}], headers=admin_headers)
+    assert published == [(other, JOB_UPDATED, assigned)]
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app import metrics
+
+
+def test_failed_statements_are_counted_and_leave_no_state():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    before = metrics.db_statements._values.get((), 0), metrics.db_errors._values.get((), 0)
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1"))
+        assert "query_started_at" not in connection.info
+    after = metrics.db_statements._values[()], metrics.db_errors._values[()]
+    assert (after[0] - before[0], after[1] - before[1]) == (2, 1)
+
+
+def _series(histogram, labels):
+    return histogram._series.get(labels, [None, 0.0, 0])[2]
+
+
+@pytest.mark.parametrize(
+    "content_type, streamed", [(b"text/event-stream", True), (b"application/json", False)]
+)
+def test_streamed_responses_stay_out_of_the_latency_histogram(content_type, streamed):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type)]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    labels = ("GET", "unmatched")
+    before = _series(metrics.stream_duration, labels), _series(metrics.request_latency, labels)
+    middleware = metrics.MetricsMiddleware(app)
+    asyncio.run(middleware({"type": "http", "method": "GET"}, None, send))
+    after = _series(metrics.stream_duration, labels), _series(metrics.request_latency, labels)
+    assert (after[0] - before[0], after[1] - before[1]) == ((1, 0) if streamed else (0, 1))
@@ -0,0 +1,54 @@
+import pytest
+
+from app.query_budget import ENDPOINT_BUDGETS, QueryBudgetExceeded
+
+
+@pytest.fixture
+def job(client, admin_headers, ids):
+    payload = {"title": "Delivery", "customer_id": ids["customer"], "driver_id": ids["driver"]}
+    response = client.post("/jobs", json=payload, headers=admin_headers)
+    response.raise_for_status()
+    return response.json()
+
+
+@pytest.mark.parametrize(
+    "route",
+    ["/jobs", "/jobs/{job_id}", "/invoices", "/customers", "/credit-notes", "/drivers"],
+)
+def test_admin_reads_stay_within_budget(client, admin_headers, job, query_budget, route):
+    with query_budget.endpoint("GET", route):
+        response = client.get(route.format(job_id=job["id"]), headers=admin_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("route", ["/drivers/me", "/drivers/me/jobs"])
+def test_driver_reads_stay_within_budget(client, driver_headers, job, query_budget, route):
+    with query_budget.endpoint("GET", route):
+        response = client.get(route, headers=driver_headers)
+    assert response.status_code == 200
+
+
+def test_job_action_stays_within_budget(client, driver_headers, job, query_budget):
+    with query_budget.endpoint("POST", "/jobs/{job_id}/{action}"):
+        response = client.post(f"/jobs/{job['id']}/start", headers=driver_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+
+
+def test_job_list_does_not_grow_with_rows(client, admin_headers, ids, query_budget):
+    jobs = [{"title": f"Job {n}", "customer_id": ids["customer"]} for n in range(20)]
+    client.post("/jobs/bulk", json=jobs, headers=admin_headers).raise_for_status()
+    with query_budget.endpoint("GET", "/jobs"):
+        response = client.get("/jobs", params={"limit": 50}, headers=admin_headers)
+    assert len(response.json()["items"]) > 20
+
+
+def test_budget_failure_lists_statements(client, admin_headers, query_budget):
+    with pytest.raises(QueryBudgetExceeded, match="1. SELECT"):
+        with query_budget(0):
+            client.get("/customers", headers=admin_headers)
+
+
+def test_every_budget_names_a_route(client):
+    routes = {(method, route.path) for route in client.app.routes for method in getattr(route, "methods", ())}
+    assert set(ENDPOINT_BUDGETS) <= routes
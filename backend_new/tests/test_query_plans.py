@@ -0,0 +1,5 @@
+from check_query_plans import check
+
+
+def test_hot_queries_use_indexes():
+    assert check("sqlite://") == 0